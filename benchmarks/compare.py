@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Compares two result files from `benchmarks.run`.
+
+    $ python -m benchmarks.compare baseline.json results.json --threshold 10
+
+Prints the change in throughput and p99 latency of every benchmark found in
+both files, and exits with status 1 if any throughput dropped more than
+`--threshold` percent.
+"""
+from __future__ import unicode_literals, print_function
+import argparse
+import json
+import sys
+
+
+def key(result):
+    return result['benchmark'], result['engine'], result['corpus']
+
+
+def compare(baseline, current, threshold):
+    """
+    Returns the lines to print and whether there were regressions.
+    """
+
+    before = dict((key(r), r) for r in baseline['results'])
+    lines = []
+    regressed = False
+
+    for result in current['results']:
+        old = before.get(key(result))
+        if old is None:
+            continue
+
+        speed = (result['calls_per_second'] / old['calls_per_second'] - 1) * 100
+        p99 = (result['latency']['p99'] / old['latency']['p99'] - 1) * 100
+        flag = ''
+        if speed < -threshold:
+            flag = '  REGRESSION'
+            regressed = True
+
+        lines.append('%-14s %-10s %-8s throughput %+7.1f%%  p99 %+7.1f%%%s' % (
+            result['benchmark'], result['engine'] or '-', result['corpus'], speed, p99, flag))
+
+    return lines, regressed
+
+
+def main(argv=None):
+    cli = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    cli.add_argument('baseline')
+    cli.add_argument('current')
+    cli.add_argument('--threshold', type=float, default=10,
+                     help='allowed throughput drop, in percent (default: %(default)s)')
+    args = cli.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    lines, regressed = compare(baseline, current, args.threshold)
+    print('\n'.join(lines))
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Deterministic query corpora for the benchmarks.
+
+Every corpus is generated from a fixed seed, so the same version of this
+file always produces the same queries.
+"""
+from __future__ import unicode_literals
+import random
+import graphql
+
+__all__ = ['CORPORA', 'generate']
+
+SEED = 1505
+
+
+def name(rand):
+    return rand.choice('abcdefghijklmnopqrstuvwxyz') + '%x' % rand.randint(0, 0xfff)
+
+
+def literal(rand):
+    kind = rand.randint(0, 4)
+    if kind == 0:
+        return rand.randint(-10000, 10000)
+    if kind == 1:
+        return round(rand.uniform(-100, 100), 3)
+    if kind == 2:
+        return ' '.join(name(rand) for _ in range(rand.randint(1, 4)))
+    return [None, True, False][rand.randint(0, 2)]
+
+
+def params(rand, count):
+    if not count:
+        return literal(rand)
+
+    return dict((name(rand), literal(rand)) for _ in range(count))
+
+
+def obj(rand, depth, width, filters=0, with_params=True):
+    properties = [{'name': name(rand)} for _ in range(width)]
+    if depth > 1:
+        properties.insert(rand.randint(0, width), obj(rand, depth - 1, width, filters, with_params))
+
+    node = {'name': name(rand), 'properties': properties}
+    if with_params:
+        node['params'] = params(rand, rand.randint(0, 3))
+    if filters:
+        node['filters'] = [(name(rand), params(rand, rand.randint(0, 2))) for _ in range(filters)]
+
+    return node
+
+
+def typical(rand):
+    return [obj(rand, rand.randint(1, 3), rand.randint(2, 6), rand.randint(0, 2))
+            for _ in range(rand.randint(1, 3))]
+
+
+def deep(rand):
+    # pyparsing runs out of stack a bit after 50 levels
+    return [obj(rand, 45, 2, 1)]
+
+
+def wide(rand):
+    return [obj(rand, 2, 1000)]
+
+
+def filters(rand):
+    return [obj(rand, 2, 5, 50)]
+
+
+def strings(rand):
+    text = ''.join(rand.choice('abcdefghij \\"\'{}') for _ in range(100000))
+    return [{'name': 'document', 'params': {'body': text}, 'properties': [{'name': 'id'}]}]
+
+
+def objects(rand):
+    return [obj(rand, 2, 3, 1) for _ in range(500)]
+
+
+# name -> (generator of one AST, number of queries)
+CORPORA = {
+    'typical': (typical, 200),
+    'deep': (deep, 20),
+    'wide': (wide, 20),
+    'filters': (filters, 20),
+    'strings': (strings, 5),
+    'objects': (objects, 5),
+}
+
+
+def generate(corpus):
+    """
+    Returns the list of queries in a corpus, as text.
+    """
+
+    generator, count = CORPORA[corpus]
+    rand = random.Random('%s-%s' % (SEED, corpus))
+
+    return [graphql.dumps(generator(rand)) for _ in range(count)]
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Measures how long ``import graphql`` takes in a fresh interpreter, using
+``python -X importtime`` (Python 3.7+).
+
+    $ python -m benchmarks.importtime
+"""
+from __future__ import unicode_literals, print_function
+import json
+import subprocess
+import sys
+
+
+def measure(statement='import graphql', runs=5):
+    """
+    Runs `statement` in `runs` new interpreters. Returns the best cumulative
+    import time of each top-level module it imported, in microseconds, and
+    whether pyparsing was imported at all, directly or not.
+    """
+
+    best = {}
+    imported = set()
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, '-X', 'importtime', '-c', statement],
+            stderr=subprocess.STDOUT).decode('utf-8')
+
+        for line in output.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+
+            _, cumulative, module = line[len('import time:'):].split('|')
+            imported.add(module.strip())
+            if module.startswith('  '):  # only time top-level imports
+                continue
+
+            module = module.strip()
+            best[module] = min(int(cumulative), best.get(module, float('inf')))
+
+    return {
+        'statement': statement,
+        'total_us': sum(best.values()),
+        'graphql_us': best.get('graphql'),
+        'imports_pyparsing': any(
+            m == 'pyparsing' or m.startswith('pyparsing.') for m in imported),
+        'modules': best,
+    }
+
+
+def main():
+    print(json.dumps(measure(), indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Runs the benchmarks and prints the results as JSON.
+
+    $ python -m benchmarks.run --output results.json
+    $ python -m benchmarks.run --benchmark loads --engine fast --corpus deep
+
+Each benchmark goes through every query of a corpus `--repeat` times,
+timing every call, and reports throughput, latency percentiles and the
+peak memory allocated by a single pass over the corpus.
+"""
+from __future__ import unicode_literals, print_function
+import argparse
+import gc
+import json
+import platform
+import sys
+import timeit
+import graphql
+import graphql.spans
+from graphql.graphql import ENGINES
+from . import corpus, importtime
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+def bench_loads(queries, engine):
+    return queries, lambda query: graphql.loads(query, engine=engine)
+
+
+def bench_loads_memoize(queries, engine):
+    return queries, lambda query: graphql.loads(query, memoize=True)
+
+
+def bench_dumps(queries, engine):
+    return [graphql.loads(q, engine='fast') for q in queries], graphql.dumps
+
+
+def bench_dumps_compact(queries, engine):
+    return ([graphql.loads(q, engine='fast') for q in queries],
+            lambda ast: graphql.dumps(ast, compact=True))
+
+
+def bench_roundtrip(queries, engine):
+    return queries, lambda query: graphql.dumps(graphql.loads(query, engine=engine))
+
+
+def bench_binary_decode(queries, engine):
+    return ([graphql.binary.encode(graphql.loads(q, engine='fast')) for q in queries],
+            graphql.binary.decode)
+
+
+def bench_top_level_names(queries, engine):
+    return ([query.encode('utf-8') for query in queries],
+            lambda data: [obj.name for obj in graphql.spans.iterparse(data)])
+
+
+# name -> (setup, whether it depends on the engine)
+BENCHMARKS = {
+    'loads': (bench_loads, True),
+    'loads_memoize': (bench_loads_memoize, False),
+    'dumps': (bench_dumps, False),
+    'dumps_compact': (bench_dumps_compact, False),
+    'roundtrip': (bench_roundtrip, True),
+    'binary_decode': (bench_binary_decode, False),
+    'top_level_names': (bench_top_level_names, False),
+}
+
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+
+def measure(inputs, func, repeat):
+    """
+    Calls `func` on every input, `repeat` times. Returns the per-call
+    timings, in seconds, and the peak memory of one pass.
+    """
+
+    timer = timeit.default_timer
+    timings = []
+
+    func(inputs[0])  # warm up
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for value in inputs:
+                start = timer()
+                func(value)
+                timings.append(timer() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    peak = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+        for value in inputs:
+            func(value)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return timings, peak
+
+
+def run(benchmark, engine, corpus_name, repeat):
+    queries = corpus.generate(corpus_name)
+    setup, _ = BENCHMARKS[benchmark]
+    inputs, func = setup(queries, engine)
+
+    timings, peak = measure(inputs, func, repeat)
+    total = sum(timings)
+    ordered = sorted(timings)
+    size = sum(len(q) for q in queries) * repeat
+
+    return {
+        'benchmark': benchmark,
+        'engine': engine,
+        'corpus': corpus_name,
+        'calls': len(timings),
+        'seconds': total,
+        'calls_per_second': len(timings) / total,
+        'mb_per_second': size / total / 1e6,
+        'latency': {
+            'p50': percentile(ordered, 50),
+            'p90': percentile(ordered, 90),
+            'p99': percentile(ordered, 99),
+            'max': ordered[-1],
+        },
+        'peak_memory': peak,
+    }
+
+
+def main(argv=None):
+    cli = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    cli.add_argument('--benchmark', action='append', choices=sorted(BENCHMARKS),
+                     help='benchmark to run, can be repeated (default: all)')
+    cli.add_argument('--engine', action='append', choices=ENGINES,
+                     help='engine to run with, can be repeated (default: all)')
+    cli.add_argument('--corpus', action='append', choices=sorted(corpus.CORPORA),
+                     help='corpus to run on, can be repeated (default: all)')
+    cli.add_argument('--repeat', type=int, default=3,
+                     help='passes over each corpus (default: %(default)s)')
+    cli.add_argument('--output', help='file to write the results to (default: stdout)')
+    cli.add_argument('--skip-import', action='store_true',
+                     help="don't measure the import time of the package")
+    args = cli.parse_args(argv)
+
+    results = []
+    for benchmark in args.benchmark or sorted(BENCHMARKS):
+        _, per_engine = BENCHMARKS[benchmark]
+        engines = (args.engine or ENGINES) if per_engine else [None]
+
+        for engine in engines:
+            for corpus_name in args.corpus or sorted(corpus.CORPORA):
+                result = run(benchmark, engine, corpus_name, args.repeat)
+                results.append(result)
+                print('%-14s %-10s %-8s %10.1f calls/s  p50 %8.3f ms  p99 %8.3f ms' % (
+                    benchmark, engine or '-', corpus_name, result['calls_per_second'],
+                    result['latency']['p50'] * 1000, result['latency']['p99'] * 1000),
+                    file=sys.stderr)
+
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+    # `-X importtime` is only there since Python 3.7
+    if not args.skip_import and sys.version_info >= (3, 7):
+        report['import'] = importtime.measure()
+        print('import graphql %.1f ms, pyparsing %s' % (
+            report['import']['graphql_us'] / 1000.0,
+            'imported' if report['import']['imports_pyparsing'] else 'not imported'),
+            file=sys.stderr)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,51 @@
+import importlib
+import sys
+import types
 from .graphql import *
-from . import grammar
+from .template import compile, Template
+from .hashing import fingerprint
+from .merging import merge
+from .diffing import diff, IncrementalEncoder
+from . import analysis
+from . import binary
+from . import instrumentation
+from . import parser
+from . import project
+from . import nodes
+from . import registry
+
+# `compile` is left out, so `from graphql import *` doesn't shadow the
+# builtin: use it as `graphql.compile`.
+__all__ = ['loads', 'loads_many', 'load', 'iterload', 'dumps', 'dump', 'iterdumps',
+           'Parser', 'Encoder', 'QueryCache', 'IncrementalParser', 'Template',
+           'fingerprint', 'merge', 'diff', 'IncrementalEncoder']
+
+
+# `graphql.grammar` imports pyparsing and builds the grammar,
+# `graphql.spans` compiles its own regexes, and `graphql.execute` imports
+# asyncio (and needs Python 3.5), so they're only loaded when used.
+LAZY_MODULES = ('grammar', 'spans', 'execute')
+
+
+class Package(types.ModuleType):
+    """
+    The class of the `graphql` module, which imports `LAZY_MODULES` the
+    first time they're accessed.
+    """
+
+    def __getattr__(self, name):
+        if name in LAZY_MODULES:
+            return importlib.import_module('.' + name, self.__name__)
+
+        raise AttributeError('module %r has no attribute %r' % (self.__name__, name))
+
+
+try:
+    sys.modules[__name__].__class__ = Package
+except TypeError:
+    # Before Python 3.5, a module's class can't be changed, so it's replaced
+    # by a copy. The original is kept alive, or Python 2 clears its globals.
+    package = Package(__name__, __doc__)
+    package.__dict__.update(sys.modules[__name__].__dict__)
+    package._module = sys.modules[__name__]
+    sys.modules[__name__] = package
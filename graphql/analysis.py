@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Query cost analysis, to reject expensive queries before running them.
+
+>>> graphql.analysis.cost(ast, weights={'friends': 10})
+Cost(depth=4, fields=8, fanout=50, cost=84)
+>>> graphql.analysis.cost(ast, limits={'depth': 2})
+LimitExceeded: Query exceeds the depth limit of 2
+
+`loads` can also enforce limits on the size, depth and number of fields
+of a query while parsing it, with ``graphql.loads(query, limits={'depth': 10})``.
+"""
+from __future__ import unicode_literals
+from collections import namedtuple
+import six
+from . import parser
+from .parser import LimitExceeded, get_limits
+
+__all__ = ['cost', 'check', 'Cost', 'LimitExceeded']
+
+# Filters whose param is the number of items an object returns, so its
+# properties are fetched that many times.
+FANOUT_FILTERS = ('first', 'last')
+
+LIMITS = ('depth', 'fields', 'fanout', 'cost')
+
+# Tokens after which a name isn't a field: a filter, a param or a literal
+NOT_FIELD = frozenset(['.', ':', '('])
+
+
+class Cost(namedtuple('Cost', 'depth fields fanout cost')):
+    """
+    The complexity of a query: how deep it's nested, how many objects and
+    fields it selects, the most times a single field is fetched, given
+    the page sizes of the objects around it, and the total of the weights
+    of every field, each multiplied by the times it's fetched.
+    """
+
+    __slots__ = ()
+
+
+def cost(ast, weights=None, limits=None, fanout=FANOUT_FILTERS):
+    """
+    Computes the `Cost` of an AST, dicts or nodes.
+
+    `weights` maps field names to their cost, 1 by default. The page size
+    of an object is the param of its `fanout` filters (``first(10)``).
+    `limits` maps any of ``depth``, ``fields``, ``fanout`` and ``cost`` to
+    their maximum; `LimitExceeded` is raised as soon as one is exceeded,
+    without walking the rest of the query.
+    """
+
+    weights = weights or {}
+    max_depth, max_fields, max_fanout, max_cost = get_limits(limits, LIMITS)
+    depth = fields = most = total = 0
+
+    # (object, level, times it's fetched) still to visit
+    stack = [(obj, 1, 1) for obj in reversed(ast)]
+    while stack:
+        obj, level, times = stack.pop()
+
+        if isinstance(obj, dict):
+            name, filters, properties = obj['name'], obj.get('filters'), obj.get('properties')
+        else:
+            name, filters, properties = obj.name, obj.filters, obj.properties
+
+        fields += 1
+        total += weights.get(name, 1) * times
+        depth = max(depth, level)
+        most = max(most, times)
+
+        if max_fields is not None and fields > max_fields:
+            raise LimitExceeded('fields', max_fields, fields)
+        if max_depth is not None and depth > max_depth:
+            raise LimitExceeded('depth', max_depth, depth)
+        if max_fanout is not None and most > max_fanout:
+            raise LimitExceeded('fanout', max_fanout, most)
+        if max_cost is not None and total > max_cost:
+            raise LimitExceeded('cost', max_cost, total)
+
+        if properties:
+            times *= page_size(filters, fanout)
+            stack.extend((prop, level + 1, times) for prop in reversed(properties))
+
+    return Cost(depth, fields, most, total)
+
+
+def page_size(filters, fanout):
+    """
+    Returns the largest integer param of the `fanout` filters, or 1.
+    """
+
+    if not filters:
+        return 1
+
+    if isinstance(filters, dict):
+        filters = filters.items()
+
+    size = 1
+    for name, params in filters:
+        if name in fanout and type(params) in six.integer_types:
+            size = max(size, params)
+
+    return size
+
+
+def check(query, limits):
+    """
+    Checks the `parser.PARSE_LIMITS` of a query string without parsing it,
+    raising `LimitExceeded` as soon as one is exceeded. It only goes
+    through the tokens of the query once, so it's much cheaper than
+    parsing it, let alone parsing a hostile, deeply nested one.
+    """
+
+    max_bytes, max_depth, max_fields, max_tokens, max_objects = get_limits(limits)
+    depth = fields = objects = 0
+
+    if max_bytes is not None and len(query) > max_bytes:
+        raise LimitExceeded('bytes', max_bytes, len(query))
+
+    tokens = parser.tokenize(query)
+    if max_tokens is not None and len(tokens) > max_tokens:
+        raise LimitExceeded('tokens', max_tokens, len(tokens))
+    tokens.append(parser.EOF)
+
+    prev = None
+    for i, tok in enumerate(tokens):
+        if tok == '{':
+            depth += 1
+            if max_depth is not None and depth > max_depth:
+                raise LimitExceeded('depth', max_depth, depth)
+        elif tok == '}':
+            depth -= 1
+        elif (tok[:1] in parser.NAME_START and prev not in NOT_FIELD and
+                tokens[i + 1] != ':'):
+            fields += 1
+            if max_fields is not None and fields > max_fields:
+                raise LimitExceeded('fields', max_fields, fields)
+
+            if depth == 1:
+                objects += 1
+                if max_objects is not None and objects > max_objects:
+                    raise LimitExceeded('objects', max_objects, objects)
+
+        prev = tok
@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+"""
+A compact binary form of parsed queries, to send them to other processes.
+
+>>> data = graphql.binary.encode(graphql.loads('{ user(id: 232) { id, name } }'))
+>>> graphql.binary.decode(data)
+[{'name': 'user', 'params': {'id': 232}, 'properties': [{'name': 'id'}, {'name': 'name'}]}]
+
+It's smaller than the pickled AST, and decoding it is much faster than
+parsing the query again, though not than unpickling. Unlike a pickle,
+it's only data, so it can be decoded whatever process it came from.
+`decode` reads from any buffer, like a `memoryview` of shared memory,
+without copying it first. `graphql.dumps` gives the same query for the
+decoded AST as for the original one.
+
+The format is `MAGIC`, then a byte with the sizes of the integers of each
+kind, as codes in `SIZES`, two bits each: words, lengths, then ints, and
+in the seventh bit, whether the `COUNTS` that follow have 4 bytes instead
+of 2. They're the length of each of these parts:
+
+- Text: the names of objects, fields, filters and params, then the string
+  literals, each only once, in UTF-8.
+- Lengths, unsigned, all of the same size, the smallest that fits them
+  all: 1, 2 or 4 bytes. The length of each name and string, in characters.
+- Ints: the int literals, in the order they're used, signed, of the
+  smallest size that fits them all too.
+- Floats, 8 bytes each.
+- Words, unsigned, of the smallest size too, which describe the query
+  itself, starting with the number of top-level objects, and then the
+  objects.
+
+A list of objects is made of runs: the number of fields that come next,
+with the `FLAGS` of the object after them, as ``count << 3 | flags``, the
+index of the name of each field, then if the list doesn't end there, the
+object. An object is the index of its name, then the parts it has: its
+params, a value; its filters, their number then the index of the name and
+the params of each; and its properties, their number then the list.
+
+A value is a `TAGS` word, followed by the index of the string for
+`STRING` and `BIGINT` (its digits, for ints too large for 4 bytes), and
+for `MAP`, the number of params then the index of the name and the value
+of each. The value of an `INT` or `FLOAT` is the next of its kind.
+
+Reading integers from words of a fixed size is done for a whole array at
+once, which is much faster in Python than varints, read byte by byte.
+"""
+from __future__ import unicode_literals
+from array import array
+import codecs
+from itertools import islice
+try:
+    from itertools import accumulate
+except ImportError:  # Python 2
+    accumulate = None
+import struct
+import sys
+import six
+from .nodes import UNSET, Object, Field, Filter
+
+__all__ = ['encode', 'decode']
+
+# The version is the last byte
+MAGIC = b'GQB\x01'
+
+# The number of names, strings, bytes of text, ints, floats and words, by
+# whether they take 4 bytes
+COUNTS = {False: struct.Struct(str('<6H')), True: struct.Struct(str('<6I'))}
+LARGE_COUNTS = 0x40
+
+# Sizes of integers, by code
+SIZES = (1, 2, 4)
+
+# Which parts an object has
+PARAMS, FILTERS, PROPERTIES = 1, 2, 4
+FLAGS = 3
+
+# The types of values
+NULL, FALSE, TRUE, INT, BIGINT, FLOAT, STRING, MAP = range(8)
+TAGS = {None: NULL, False: FALSE, True: TRUE}
+CONSTANTS = (None, False, True)
+
+# Array type codes by size, of words and ints
+WORD_TYPES = {1: str('B'), 2: str('H'), 4: str('I') if array(str('I')).itemsize == 4 else str('L')}
+INT_TYPES = {1: str('b'), 2: str('h'), 4: str('i') if array(str('i')).itemsize == 4 else str('l')}
+MAX_INT = 0x7fffffff
+
+FLOAT_TYPE = str('d')
+
+
+def encode(ast):
+    """
+    Encodes an AST, dicts or nodes, into bytes.
+    """
+
+    encoder = BinaryEncoder()
+    encoder.encode_objects(ast)
+    return encoder.pack()
+
+
+class BinaryEncoder(object):
+    """
+    The parts of the binary form of an AST, as it's encoded.
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.strings = {}
+        self.ints = []
+        self.floats = []
+        self.words = []
+
+    def encode_objects(self, ast):
+        words = self.words
+        names = self.names
+
+        words.append(len(ast))
+        stack = [(ast, 0)]
+        while stack:
+            properties, i = stack.pop()
+            if i == len(properties):
+                continue
+
+            # A run of fields, then an object, if any
+            run = len(words)
+            words.append(0)
+            obj = None
+            while i < len(properties):
+                prop = properties[i]
+                if isinstance(prop, dict):
+                    if len(prop) != 1:
+                        obj = prop
+                        break
+                    words.append(index(names, prop['name']))
+                else:
+                    if prop.properties is not None or prop.filters is not None or prop.params is not UNSET:
+                        obj = prop
+                        break
+                    words.append(index(names, prop.name))
+                i += 1
+
+            count = len(words) - run - 1
+            if obj is None:
+                words[run] = count << FLAGS
+                continue
+            stack.append((properties, i + 1))
+
+            if isinstance(obj, dict):
+                name, params = obj['name'], obj.get('params', UNSET)
+                filters, nested = obj.get('filters'), obj.get('properties')
+            else:
+                name, params, filters, nested = obj.name, obj.params, obj.filters, obj.properties
+
+            flags = 0
+            if params is not UNSET:
+                flags |= PARAMS
+            if filters is not None:
+                flags |= FILTERS
+            if nested is not None:
+                flags |= PROPERTIES
+
+            words[run] = count << FLAGS | flags
+            words.append(index(names, name))
+
+            if params is not UNSET:
+                self.encode_value(params)
+
+            if filters is not None:
+                if isinstance(filters, dict):
+                    filters = list(filters.items())
+                words.append(len(filters))
+                for filter_name, filter_params in filters:
+                    words.append(index(names, filter_name))
+                    self.encode_value(filter_params)
+
+            if nested is not None:
+                words.append(len(nested))
+                stack.append((nested, 0))
+
+    def encode_value(self, value):
+        words = self.words
+
+        if value is None or value is True or value is False:
+            words.append(TAGS[value])
+        elif isinstance(value, six.integer_types):
+            if -MAX_INT <= value <= MAX_INT:
+                words.append(INT)
+                self.ints.append(value)
+            else:
+                words.extend((BIGINT, index(self.strings, six.text_type(value))))
+        elif isinstance(value, float):
+            words.append(FLOAT)
+            self.floats.append(value)
+        elif isinstance(value, six.string_types):
+            words.extend((STRING, index(self.strings, value)))
+        elif isinstance(value, dict):
+            words.extend((MAP, len(value)))
+            for key, item in value.items():
+                words.append(index(self.names, key))
+                self.encode_value(item)
+        else:
+            raise TypeError("Can't encode %r" % (value,))
+
+    def pack(self):
+        names = sorted(self.names, key=self.names.get)
+        strings = sorted(self.strings, key=self.strings.get)
+        text = ''.join(names + strings).encode('utf-8')
+        lengths = [len(string) for string in names + strings]
+
+        word_size = size_of(max(self.words), 8)
+        length_size = size_of(max(lengths or [0]), 8)
+        int_size = size_of(max([abs(value) for value in self.ints] or [0]), 7)
+
+        counts = (len(names), len(strings), len(text),
+                  len(self.ints), len(self.floats), len(self.words))
+        large = max(counts) > 0xffff
+        sizes = (SIZES.index(word_size) | SIZES.index(length_size) << 2 |
+                 SIZES.index(int_size) << 4 | (LARGE_COUNTS if large else 0))
+
+        return b''.join([
+            MAGIC,
+            six.int2byte(sizes),
+            COUNTS[large].pack(*counts),
+            text,
+            to_bytes(array(WORD_TYPES[length_size], lengths)),
+            to_bytes(array(INT_TYPES[int_size], self.ints)),
+            to_bytes(array(FLOAT_TYPE, self.floats)),
+            to_bytes(array(WORD_TYPES[word_size], self.words)),
+        ])
+
+
+def size_of(largest, bits):
+    """
+    Returns the size in bytes, 1, 2 or 4, of integers up to `largest`,
+    with `bits` bits of each byte for the magnitude.
+    """
+
+    size = 1
+    while largest >> (size * 8 - 8 + bits):
+        size *= 2
+    return size
+
+
+def index(table, string):
+    """
+    Returns the index of `string` in `table`, adding it if it's new.
+    """
+
+    try:
+        return table[string]
+    except KeyError:
+        return table.setdefault(string, len(table))
+
+
+def to_bytes(values):
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tostring() if six.PY2 else values.tobytes()
+
+
+# Little-endian bytes can be read as integers in place, without an array
+CAST_VIEWS = not six.PY2 and sys.byteorder == 'little'
+
+
+def from_bytes(typecode, data):
+    """
+    Returns the list of the integers or floats in `data`, a memoryview of
+    bytes, in little-endian order.
+    """
+
+    if not len(data):
+        return []
+    if CAST_VIEWS:
+        return data.cast(typecode).tolist()
+
+    values = array(typecode)
+    if six.PY2:
+        values.fromstring(data.tobytes())
+    else:
+        values.frombytes(data)
+
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tolist()
+
+
+def split(text, lengths):
+    """
+    Cuts `text` into strings of the given `lengths`.
+    """
+
+    if accumulate is None:
+        strings = []
+        offset = 0
+        for length in lengths:
+            strings.append(text[offset:offset + length])
+            offset += length
+        return strings
+
+    ends = list(accumulate(lengths))
+    return list(map(text.__getitem__, map(slice, [0] + ends, ends)))
+
+
+def decode(data, nodes=False):
+    """
+    Decodes the AST encoded in `data`, bytes or any object with the buffer
+    interface, into dicts, or into `graphql.nodes` if `nodes` is true.
+    Raises ValueError if `data` isn't a valid encoding.
+    """
+
+    buf = memoryview(data)
+    if not six.PY2:
+        buf = buf.cast('B')
+
+    if len(buf) <= len(MAGIC) or buf[:len(MAGIC)].tobytes() != MAGIC:
+        raise ValueError('Not a binary query, or not of this version')
+
+    sizes = six.indexbytes(buf, len(MAGIC))
+    try:
+        word_size, length_size, int_size = SIZES[sizes & 3], SIZES[sizes >> 2 & 3], SIZES[sizes >> 4 & 3]
+        counts = COUNTS[bool(sizes & LARGE_COUNTS)]
+        start = len(MAGIC) + 1 + counts.size
+        name_count, string_count, text_size, int_count, float_count, word_count = \
+            counts.unpack_from(buf, len(MAGIC) + 1)
+    except (IndexError, struct.error):
+        raise ValueError('Truncated or invalid binary query')
+
+    lengths_start = start + text_size
+    ints_start = lengths_start + (name_count + string_count) * length_size
+    floats_start = ints_start + int_count * int_size
+    words_start = floats_start + float_count * 8
+    end = words_start + word_count * word_size
+    if len(buf) != end:
+        raise ValueError('Expected %d bytes, got %d' % (end, len(buf)))
+
+    text = codecs.utf_8_decode(buf[start:lengths_start])[0]
+    lengths = from_bytes(WORD_TYPES[length_size], buf[lengths_start:ints_start])
+    ints = from_bytes(INT_TYPES[int_size], buf[ints_start:floats_start])
+    floats = from_bytes(FLOAT_TYPE, buf[floats_start:words_start])
+    words = from_bytes(WORD_TYPES[word_size], buf[words_start:end])
+
+    strings = split(text, lengths)
+
+    try:
+        return read_objects(words, strings[:name_count], strings[name_count:], ints, floats, nodes)
+    except (IndexError, StopIteration):
+        raise ValueError('Truncated or invalid binary query')
+
+
+def read_objects(words, names, strings, ints, floats, nodes):
+    """
+    Reads the AST from the lists of words, names, strings, int literals
+    and floats.
+    """
+
+    words = iter(words)
+    next_word = getattr(words, '__next__', None) or words.next
+    next_int = getattr(iter(ints), '__next__', None) or iter(ints).next
+    next_float = getattr(iter(floats), '__next__', None) or iter(floats).next
+
+    def read_value():
+        tag = next_word()
+        if tag < INT:
+            return CONSTANTS[tag]
+        if tag == INT:
+            return next_int()
+        if tag == STRING:
+            return strings[next_word()]
+        if tag == MAP:
+            params = {}
+            for _ in range(next_word()):
+                key = names[next_word()]
+                params[key] = read_value()
+            return params
+        if tag == FLOAT:
+            return next_float()
+        if tag == BIGINT:
+            return int(strings[next_word()])
+        raise ValueError('Unknown value type %d' % tag)
+
+    if nodes:
+        make_fields = lambda indexes: map(Field, map(names.__getitem__, indexes))
+    else:
+        templates = [{'name': name} for name in names]
+        make_fields = lambda indexes: map(dict.copy, map(templates.__getitem__, indexes))
+
+    ast = []
+    # The lists being read, each with the number of objects left to read
+    stack = [[ast, next_word()]]
+
+    while stack:
+        top = stack[-1]
+        if not top[1]:
+            stack.pop()
+            continue
+
+        run = next_word()
+        count = run >> FLAGS
+        if count:
+            top[0].extend(make_fields(islice(words, count)))
+            top[1] -= count
+            if not top[1]:
+                stack.pop()
+                continue
+
+        top[1] -= 1
+        name = names[next_word()]
+        if not run & 7:
+            top[0].append(Field(name) if nodes else {'name': name})
+            continue
+
+        params = UNSET
+        if run & PARAMS:
+            params = read_value()
+
+        filters = None
+        if run & FILTERS:
+            filters = []
+            for _ in range(next_word()):
+                filter_name = names[next_word()]
+                filter_params = read_value()
+                filters.append(Filter(filter_name, filter_params) if nodes
+                               else (filter_name, filter_params))
+
+        properties = None
+        if run & PROPERTIES:
+            properties = []
+
+        if nodes:
+            obj = Object(name, params, filters, properties)
+        else:
+            obj = {'name': name}
+            if params is not UNSET:
+                obj['params'] = params
+            if filters is not None:
+                obj['filters'] = filters
+            if properties is not None:
+                obj['properties'] = properties
+
+        top[0].append(obj)
+        if properties is not None:
+            stack.append([properties, next_word()])
+
+    if next(words, None) is not None:
+        raise ValueError('Unexpected data after the query')
+
+    return ast
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import threading
+from collections import OrderedDict
+
+__all__ = ['QueryCache']
+
+
+class QueryCache(object):
+    """
+    Bounded LRU cache of parsed queries, keyed on the query text.
+
+    Pass it to `graphql.loads` with the `cache` argument. Entries are
+    evicted, least recently used first, once there are more than
+    `max_entries` of them or their query texts add up to more than
+    `max_bytes` characters (`None` disables that bound).
+
+    The cache keeps its own copy of every AST and hands out copies, so
+    callers are free to mutate what they get. Pass ``copy=False`` to store
+    values that are never mutated as they are. It's safe to share a cache
+    between threads.
+
+    >>> cache = graphql.QueryCache(max_entries=500)
+    >>> graphql.loads(query, cache=cache)
+    >>> cache.hits, cache.misses, cache.evictions
+    (0, 1, 0)
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, copy=True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.copy = copy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0  # total length of the cached query texts
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, query):
+        return query in self._entries
+
+    def get(self, query):
+        """
+        Returns a copy of the AST cached for `query`, or `None`.
+        """
+
+        with self._lock:
+            try:
+                ast = self._entries.pop(query)
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self._entries[query] = ast
+            self.hits += 1
+
+        return copy_ast(ast) if self.copy else ast
+
+    def put(self, query, ast):
+        """
+        Caches a copy of `ast` as the result of parsing `query`.
+        """
+
+        size = len(query)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        if self.copy:
+            ast = copy_ast(ast)
+
+        with self._lock:
+            if query in self._entries:
+                del self._entries[query]
+                self.size -= size
+
+            self._entries[query] = ast
+            self.size += size
+
+            while (len(self._entries) > self.max_entries or
+                   self.max_bytes is not None and self.size > self.max_bytes):
+                evicted, _ = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drops every entry. Counters are kept.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+def copy_ast(ast):
+    """
+    Copies a list of objects as returned by `graphql.loads`. Faster than
+    `copy.deepcopy` since it knows where the mutable parts are.
+    """
+
+    return [copy_object(obj) for obj in ast]
+
+
+def copy_object(obj):
+    obj = dict(obj)
+
+    if isinstance(obj.get('params'), dict):
+        obj['params'] = dict(obj['params'])
+
+    if 'filters' in obj:
+        obj['filters'] = [(name, dict(params) if isinstance(params, dict) else params)
+                          for name, params in obj['filters']]
+
+    if 'properties' in obj:
+        obj['properties'] = [copy_object(prop) for prop in obj['properties']]
+
+    return obj
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Differences between queries, and re-serializing a query that changed.
+
+>>> graphql.diff(graphql.loads('{ user(id: 232) { id, photos.first(10) { url } } }'),
+...              graphql.loads('{ user(id: 232) { id, name, photos.first(20) { url } } }'))
+[Change(kind='added', path=('user',), old=UNSET, new={'name': 'name'}),
+ Change(kind='filters', path=('user', 'photos'), old=[('first', 10)], new=[('first', 20)])]
+
+`IncrementalEncoder` remembers the text of every object it encoded, and
+only encodes again the objects that changed since.
+"""
+from __future__ import unicode_literals
+from collections import namedtuple
+import six
+from .cache import copy_object
+from .encoder import Encoder
+from .hashing import CANONICAL
+from .merging import copy_header, object_key
+from .nodes import UNSET, Object, Filter, name_of, properties_of
+
+__all__ = ['diff', 'Change', 'IncrementalEncoder']
+
+# Objects nested deeper than this are encoded again every time
+CACHE_DEPTH = 16
+
+# Param values equal to others of these types, like 1, 1.0 and True
+NUMBERS = frozenset((bool, float) + six.integer_types)
+
+
+class Change(namedtuple('Change', 'kind path old new')):
+    """
+    A difference between two queries. `path` holds the names of the
+    objects from the top level down to the one that changed. `kind` is:
+
+    - ``added``: `new` was added to the properties at `path`, `old` is UNSET.
+    - ``removed``: `old` was removed from them, `new` is UNSET.
+    - ``params``: the params of the object at `path` went from `old` to
+      `new`, either of which can be UNSET.
+    - ``filters``: same for its filters, None when there are none.
+    """
+
+    __slots__ = ()
+
+
+def diff(old, new):
+    """
+    Returns the list of `Change` that turn the AST `old` into `new`, both
+    dicts or both nodes. Objects are paired by name, in order, among their
+    siblings, so reordering properties isn't a change. The changes of the
+    properties of an object come after those of the object itself.
+    """
+
+    changes = []
+    stack = [((), old, new)]
+
+    while stack:
+        path, old_properties, new_properties = stack.pop()
+        nested = []
+
+        for old_prop, new_prop in pair(old_properties, new_properties):
+            if new_prop is UNSET:
+                changes.append(Change('removed', path, old_prop, UNSET))
+                continue
+            if old_prop is UNSET:
+                changes.append(Change('added', path, UNSET, new_prop))
+                continue
+
+            old_nested, new_nested = properties_of(old_prop), properties_of(new_prop)
+            if old_nested is None and new_nested is None:
+                continue
+            if old_nested is None or new_nested is None:
+                # A field turned into an object, or the other way around
+                changes.append(Change('removed', path, old_prop, UNSET))
+                changes.append(Change('added', path, UNSET, new_prop))
+                continue
+
+            # Compared in their canonical form, where 1, 1.0 and true differ
+            old_header, new_header = header_of(old_prop), header_of(new_prop)
+            prop_path = path + (name_of(new_prop),)
+            if params_key(old_header[0]) != params_key(new_header[0]):
+                changes.append(Change('params', prop_path, old_header[0], new_header[0]))
+            if filters_key(old_header[1]) != filters_key(new_header[1]):
+                changes.append(Change('filters', prop_path, old_header[1], new_header[1]))
+
+            nested.append((prop_path, old_nested, new_nested))
+
+        # Depth first, in the order of the properties
+        stack.extend(reversed(nested))
+
+    return changes
+
+
+def pair(old_properties, new_properties):
+    """
+    Pairs the properties of both lists with the same name, the first with
+    the first and so on. Unpaired ones go with UNSET.
+    """
+
+    old_by_name = {}
+    for prop in old_properties:
+        old_by_name.setdefault(name_of(prop), []).append(prop)
+
+    pairs = []
+    for prop in new_properties:
+        same_name = old_by_name.get(name_of(prop))
+        pairs.append((same_name.pop(0) if same_name else UNSET, prop))
+
+    for prop in old_properties:
+        same_name = old_by_name.get(name_of(prop))
+        if same_name and same_name[0] is prop:
+            pairs.append((same_name.pop(0), UNSET))
+
+    return pairs
+
+
+def params_key(params):
+    return None if params is UNSET else CANONICAL.encode_params(params)
+
+
+def filters_key(filters):
+    if not filters:
+        return None
+    return [(name, CANONICAL.encode_params(params)) for name, params in filters]
+
+
+def header_of(obj):
+    if isinstance(obj, dict):
+        filters = obj.get('filters')
+        if isinstance(filters, dict):
+            filters = list(filters.items())
+        return obj.get('params', UNSET), filters
+
+    return obj.params, obj.filters
+
+
+class Fragment(object):
+    """
+    The text of an object as `IncrementalEncoder` last encoded it, and a
+    copy of the object to tell whether it changed since. `children` are
+    the fragments of its nested objects, by `merging.object_key`.
+    `snapshot` is None if the object has objects deeper than `CACHE_DEPTH`
+    under it, which aren't copied.
+    """
+
+    __slots__ = ('snapshot', 'text', 'children')
+
+    def __init__(self, snapshot, text, children):
+        self.snapshot = snapshot
+        self.text = text
+        self.children = children
+
+
+class IncrementalEncoder(Encoder):
+    """
+    An `Encoder` for a query that keeps changing a little, like one a
+    client sends again and again with a field added or an argument
+    changed. It keeps the text of every object it encoded, and only
+    encodes the objects that changed since the previous call. The others
+    are compared with a copy of what they were, which is much faster than
+    encoding them, and their text is reused.
+
+    Objects nested deeper than `CACHE_DEPTH` aren't copied, and are
+    encoded again every time. So are the headers of all the objects above
+    them, up to the top level, whose text is joined again from that of
+    their properties: only the subtrees next to a deep branch are reused.
+
+    It only remembers the last query, and isn't meant to be shared
+    between threads.
+    """
+
+    def __init__(self, indent=2, compact=False):
+        super(IncrementalEncoder, self).__init__(indent, compact)
+        self._fragments = {}
+        self._next_fragments = {}
+
+    def iterencode(self, ast):
+        self._next_fragments = {}
+        for chunk in super(IncrementalEncoder, self).iterencode(ast):
+            yield chunk
+
+        self._fragments = self._next_fragments
+
+    def iterencode_object(self, obj, chunks, level=1):
+        # The text of an object is kept whole, to be reused
+        self.encode_object(obj, chunks, level)
+        return iter(())
+
+    def encode_object(self, obj, chunks, level=1):
+        key = object_key(obj)
+        text, fragment = self.render(obj, level, self._fragments.get(key))
+        if fragment is not None:
+            self._next_fragments[key] = fragment
+
+        chunks.append(text)
+
+    def render(self, obj, level, fragment):
+        """
+        Returns the text of `obj`, at `level`, and its new fragment.
+        `fragment` is what `obj` was the last time, if anything.
+        """
+
+        if fragment is not None and fragment.snapshot is not None and fragment.snapshot == obj:
+            return fragment.text, fragment
+
+        properties = properties_of(obj)
+        if properties is None or level > CACHE_DEPTH:
+            chunks = []
+            Encoder.encode_object(self, obj, chunks, level)
+            return ''.join(chunks), None
+
+        # The header, without the properties
+        chunks = []
+        header = copy_header(obj)
+        Encoder.encode_object(self, dict(header, properties=None), chunks, level)
+
+        # For the snapshot, which is compared with ==
+        if 'params' in header:
+            header['params'] = exact(header['params'])
+        if header.get('filters') is not None:
+            header['filters'] = [(name, exact(params)) for name, params in header['filters']]
+
+        old_children = fragment.children if fragment is not None else {}
+        children = {}
+        snapshots = []
+
+        chunks.append(self._open_properties)
+        for i, prop in enumerate(properties):
+            if i:
+                chunks.append(self._comma)
+
+            if properties_of(prop) is None:
+                Encoder.encode_object(self, prop, chunks, level + 1)
+                if snapshots is not None:
+                    snapshots.append(copy_object(prop) if isinstance(prop, dict) else prop)
+                continue
+
+            key = object_key(prop)
+            text, child = self.render(prop, level + 1, old_children.get(key))
+            chunks.append(text)
+
+            if child is not None:
+                children[key] = child
+            if child is None or child.snapshot is None:
+                snapshots = None
+            elif snapshots is not None:
+                snapshots.append(child.snapshot)
+
+        if self.compact:
+            chunks.append('}')
+        else:
+            chunks.append('\n' + self.indentation(level) + '}')
+
+        snapshot = None
+        if snapshots is not None:
+            if isinstance(obj, dict):
+                header['properties'] = snapshots
+                snapshot = header
+            else:
+                filters = header.get('filters')
+                if filters is not None:
+                    filters = [Filter(name, params) for name, params in filters]
+                snapshot = Object(obj.name, header.get('params', UNSET), filters, snapshots)
+
+        text = ''.join(chunks)
+        return text, Fragment(snapshot, text, children)
+
+
+class Exact(object):
+    """
+    A number or boolean in the params of a snapshot, only equal to values
+    of the same type: 1, 1.0 and True make different queries.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return type(other) is type(self.value) and other == self.value
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Exact(%r)' % (self.value,)
+
+
+def exact(params):
+    """
+    Returns `params` with its numbers and booleans in `Exact`.
+    """
+
+    if isinstance(params, dict):
+        return dict((key, Exact(value) if type(value) in NUMBERS else value)
+                    for key, value in params.items())
+
+    return Exact(params) if type(params) in NUMBERS else params
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Reusable serializer behind `graphql.dumps`, analogous to
+``json.JSONEncoder``.
+
+>>> encoder = graphql.Encoder(indent=4)
+>>> encoder.encode(ast)
+"""
+from __future__ import unicode_literals
+import json
+import re
+import six
+from .nodes import UNSET
+
+__all__ = ['Encoder']
+
+# Strings made only of these characters are their own JSON encoding, quotes
+# aside: printable ASCII but for `"` and `\`.
+SAFE_STRING_RE = re.compile(r'[ !#-\[\]-~]*\Z')
+
+# `iterencode` yields every time this many chunks have been buffered
+FLUSH_CHUNKS = 4096
+
+# The string literals cache holds this many strings, of up to this length
+MAX_CACHED_STRINGS = 4096
+MAX_CACHED_LENGTH = 128
+
+INFINITY = float('inf')
+
+
+class Encoder(object):
+    """
+    Converts ASTs (dicts or `graphql.nodes`) to their GraphQL string form.
+
+    `indent` and `compact` mean the same as in `graphql.dumps`. The
+    indentation of each level and the separators are worked out once, and
+    with `cache_strings`, the encoded form of short string literals is
+    cached, so reusing an encoder across calls is cheaper than calling
+    `dumps`. Encoders are safe to share between threads.
+    """
+
+    def __init__(self, indent=2, compact=False, cache_strings=True):
+        if compact:
+            indent = 0
+
+        self.indent = indent
+        self.compact = indent == 0
+
+        if self.compact:
+            self._open, self._close = '{', '}'
+            self._separator = ','
+            self._open_properties, self._comma = '{', ','
+            self._param_sep, self._param_comma = ':', ','
+        else:
+            self._open, self._close = '{\n', '\n}'
+            self._separator = ',\n\n'
+            self._open_properties, self._comma = ' {\n', ',\n'
+            self._param_sep, self._param_comma = ': ', ', '
+
+        self._indents = ['']
+        self._closes = ['\n}']
+        self._strings = {} if cache_strings else None
+
+    def encode(self, ast):
+        """
+        Returns the GraphQL string for `ast`, a list of objects.
+        """
+
+        return ''.join(self.iterencode(ast))
+
+    def iterencode(self, ast):
+        """
+        Yields the GraphQL string for `ast` in chunks, so it never has to
+        be built as a whole.
+        """
+
+        chunks = [self._open]
+        for i, obj in enumerate(ast):
+            if i:
+                chunks.append(self._separator)
+
+            for chunk in self.iterencode_object(obj, chunks):
+                yield chunk
+
+            if len(chunks) >= FLUSH_CHUNKS:
+                yield ''.join(chunks)
+                del chunks[:]
+
+        chunks.append(self._close)
+        yield ''.join(chunks)
+
+    def encode_object(self, obj, chunks, level=1):
+        """
+        Appends the chunks of a single object, indented at `level`, to the
+        list `chunks`.
+        """
+
+        for _ in self._encode_object(obj, chunks, level, INFINITY):
+            pass
+
+    def iterencode_object(self, obj, chunks, level=1):
+        """
+        Like `encode_object`, but each time `chunks` has `FLUSH_CHUNKS`
+        chunks, yields them joined and empties it, so that even a single
+        object is never held as a whole.
+        """
+
+        return self._encode_object(obj, chunks, level, FLUSH_CHUNKS)
+
+    def _encode_object(self, obj, chunks, level, flush):
+        """
+        Does the work of `encode_object` and `iterencode_object`, flushing
+        `chunks` once it has `flush` of them. Nested properties are kept in
+        an explicit stack instead of recursing.
+        """
+
+        append = chunks.append
+        compact = self.compact
+        indents = self._indents
+        encode_params = self.encode_params
+        open_properties, comma = self._open_properties, self._comma
+        stack = []  # [properties iterator, level, first?] for each open object
+
+        while True:
+            if not compact:
+                try:
+                    append(indents[level])
+                except IndexError:
+                    append(self.indentation(level))
+
+            if isinstance(obj, dict):
+                name, params = obj['name'], obj.get('params', UNSET)
+                filters, properties = obj.get('filters'), obj.get('properties')
+            else:
+                name, params = obj.name, obj.params
+                filters, properties = obj.filters, obj.properties
+
+            append(name)
+
+            if params is not UNSET:
+                append(encode_params(params))
+
+            if filters is not None:
+                if isinstance(filters, dict):
+                    filters = filters.items()
+
+                for filter_name, filter_params in filters:
+                    append('.')
+                    append(filter_name)
+                    append(encode_params(filter_params))
+
+            if properties is not None:
+                append(open_properties)
+                stack.append([iter(properties), level, True])
+
+            # Move on to the next property, closing every finished object
+            while stack:
+                entry = stack[-1]
+                obj = next(entry[0], None)
+                if obj is not None:
+                    if entry[2]:
+                        entry[2] = False
+                    else:
+                        append(comma)
+
+                    level = entry[1] + 1
+                    if len(chunks) >= flush:
+                        yield ''.join(chunks)
+                        del chunks[:]
+                    break
+
+                stack.pop()
+                if compact:
+                    append('}')
+                else:
+                    try:
+                        append(self._closes[entry[1]])
+                    except IndexError:
+                        self.indentation(entry[1])
+                        append(self._closes[entry[1]])
+            else:
+                return
+
+    def encode_params(self, params):
+        """
+        Returns the parenthesized form of an object's or filter's params.
+        """
+
+        if not isinstance(params, dict):
+            return '(' + self.encode_value(params) + ')'
+
+        sep = self._param_sep
+        encode_value = self.encode_value
+        return '(' + self._param_comma.join(
+            [key + sep + encode_value(value) for key, value in params.items()]) + ')'
+
+    def encode_value(self, value):
+        """
+        Returns the literal for a single param value. Strings, numbers,
+        booleans and None are converted directly; anything else goes
+        through `json.dumps`.
+        """
+
+        kind = type(value)
+
+        if kind is six.text_type:
+            strings = self._strings
+            if strings is not None:
+                try:
+                    return strings[value]
+                except KeyError:
+                    pass
+
+            if SAFE_STRING_RE.match(value):
+                literal = '"' + value + '"'
+            else:
+                literal = json.dumps(value)
+
+            if strings is not None and len(value) <= MAX_CACHED_LENGTH:
+                if len(strings) >= MAX_CACHED_STRINGS:
+                    strings.clear()
+                strings[value] = literal
+            return literal
+
+        if value is None:
+            return 'null'
+        if value is True:
+            return 'true'
+        if value is False:
+            return 'false'
+        # Exact types: bool and enums are subclasses of int
+        if kind in six.integer_types:
+            return '%d' % value
+        if kind is float and -INFINITY < value < INFINITY:
+            return repr(value)
+
+        return json.dumps(value)
+
+    def indentation(self, level):
+        """
+        Returns the indentation string of `level`, extending the
+        precomputed ones if needed.
+        """
+
+        indents = self._indents
+        if len(indents) <= level:
+            # New lists rather than appending, for other threads reading them
+            indents = [' ' * self.indent * i for i in range(level + 1)]
+            self._closes = ['\n' + pad + '}' for pad in indents]
+            self._indents = indents
+
+        return indents[level]
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Running queries with asyncio, on Python 3.5+.
+
+Resolvers are registered by field name. A resolver is given the list of
+the data of the parents of an object, and returns its data for each of
+them: a dict, a list of them, or None. Fields without a resolver are read
+from the data of their parent.
+
+>>> executor = graphql.execute.Executor()
+>>> @executor.resolver('user')
+... async def user(parents, obj):
+...     return [await db.users.get(obj['params']['id'])]
+>>> @executor.resolver('photos')
+... async def photos(parents, obj):
+...     by_user = await db.photos.for_users([user['id'] for user in parents])
+...     return [by_user[user['id']] for user in parents]
+>>> await executor.execute(graphql.loads('{ user(id: 232) { name, photos { url } } }'))
+[{'name': 'Mary', 'photos': [{'url': '...'}]}]
+
+The query is run one level at a time: all the objects with the same name,
+params and filters at a level are resolved with a single call, for all
+their parents at once, and a parent is only passed once. So fetching the
+photos of 100 users is one call, not 100. The calls of a level, and the
+top-level objects of the query, run concurrently.
+"""
+from __future__ import unicode_literals
+import asyncio
+import inspect
+from .merging import object_key
+from .nodes import name_of, properties_of
+
+__all__ = ['Executor']
+
+
+class Executor(object):
+    """
+    Runs queries with the resolvers registered on it, by field name.
+    """
+
+    def __init__(self, resolvers=None):
+        self.resolvers = dict(resolvers or {})
+
+    def register(self, name, resolve):
+        """
+        Registers `resolve` for the fields and objects called `name`. It's
+        called with the list of the data of their parents (None for
+        top-level objects) and one of the objects (dicts or nodes), all
+        with the same params and filters, and returns a list with the data
+        for each parent. It can be a coroutine function or a plain one.
+        """
+
+        self.resolvers[name] = resolve
+
+    def resolver(self, name):
+        """
+        Decorator registering a resolver for `name`.
+        """
+
+        def decorator(resolve):
+            self.register(name, resolve)
+            return resolve
+
+        return decorator
+
+    async def execute(self, ast):
+        """
+        Runs a query, an AST of dicts or nodes, and returns the list of
+        the data of its top-level objects, with only what they select.
+        Identical top-level objects are only resolved once.
+        """
+
+        calls = {}
+        return list(await asyncio.gather(*[self.execute_object(obj, calls) for obj in ast]))
+
+    async def execute_object(self, obj, calls):
+        """
+        Runs a top-level object, one level at a time. `calls` holds the
+        tasks resolving the top-level objects, by `merging.object_key`.
+        """
+
+        key = object_key(obj)
+        if name_of(obj) not in self.resolvers:
+            value = None
+        else:
+            if key not in calls:
+                calls[key] = asyncio.ensure_future(self.resolve(obj, [None]))
+            value = (await asyncio.shield(calls[key]))[0]
+
+        level = {}
+        data = shape(value, properties_of(obj), level)
+
+        while level:
+            level = await self.execute_level(level)
+
+        return data
+
+    async def execute_level(self, level):
+        """
+        Fills the data of the objects at a level, given as a dict of
+        ``(properties, sources, results)``: the data of the objects,
+        and the dicts to fill with their properties. Returns the next
+        level.
+        """
+
+        next_level = {}
+        batches = {}  # key -> (object, parents, [(result, property)])
+
+        for properties, sources, results in level.values():
+            for prop in properties:
+                name = name_of(prop)
+                if name not in self.resolvers:
+                    nested = properties_of(prop)
+                    for source, result in zip(sources, results):
+                        result[name] = shape(get(source, name), nested, next_level)
+                    continue
+
+                batch = batches.get(object_key(prop))
+                if batch is None:
+                    batch = batches[object_key(prop)] = (prop, [], [])
+                batch[1].extend(sources)
+                batch[2].extend((result, prop) for result in results)
+
+        batches = list(batches.values())
+        values = await asyncio.gather(*[self.resolve(obj, parents) for obj, parents, _ in batches])
+
+        for (_, _, targets), batch_values in zip(batches, values):
+            for value, (result, prop) in zip(batch_values, targets):
+                result[name_of(prop)] = shape(value, properties_of(prop), next_level)
+
+        return next_level
+
+    async def resolve(self, obj, parents):
+        """
+        Calls the resolver of `obj` once for the distinct `parents`, and
+        returns the data for each of `parents`.
+        """
+
+        unique = []
+        indexes = {}  # id of a parent -> its index in `unique`
+        for parent in parents:
+            if id(parent) not in indexes:
+                indexes[id(parent)] = len(unique)
+                unique.append(parent)
+
+        values = self.resolvers[name_of(obj)](unique, obj)
+        if inspect.isawaitable(values):
+            values = await values
+
+        values = list(values)
+        if len(values) != len(unique):
+            raise ValueError('Resolver for %r returned %d values for %d parents' % (
+                name_of(obj), len(values), len(unique)))
+
+        return [values[indexes[id(parent)]] for parent in parents]
+
+
+def shape(value, properties, level):
+    """
+    Returns the result for the data `value` of an object with the given
+    `properties`. Its dicts are empty, and added to `level` to be filled.
+    """
+
+    if value is None or properties is None:
+        return value
+
+    if isinstance(value, list):
+        return [shape(item, properties, level) for item in value]
+
+    entry = level.get(id(properties))
+    if entry is None:
+        entry = level[id(properties)] = (properties, [], [])
+
+    result = {}
+    entry[1].append(value)
+    entry[2].append(result)
+    return result
+
+
+def get(source, name):
+    """
+    Reads the property `name` from the data of an object, a dict or any
+    object, or None if it doesn't have it.
+    """
+
+    if isinstance(source, dict):
+        return source.get(name)
+
+    return getattr(source, name, None)
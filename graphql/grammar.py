@@ -1,46 +1,186 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+import threading
 import pyparsing as pp
 
 
 def set_debug(debug):
+    """
+    Makes the default grammar print every match attempt, for every thread.
+    Use a `graphql.Parser` with ``debug=True`` to debug a single parser.
+    """
+
     root.setDebug(debug)
 
 
-OPEN_BRACE = pp.Suppress('{')
-CLOSE_BRACE = pp.Suppress('}')
-OPEN_PAREN = pp.Suppress('(')
-CLOSE_PAREN = pp.Suppress(')')
-COMMA = pp.Suppress(',')
-COLON = pp.Suppress(':')
-DOT = pp.Suppress('.')
-EOF = pp.Suppress(pp.LineEnd())
+class Grammar(object):
+    """
+    A set of grammar elements, as attributes, made by `build`.
+    """
+
+    def __init__(self, elements):
+        self.__dict__.update(elements)
+        self.memo = None
+
+    def parse(self, query):
+        """
+        Parses a whole query with `root`. If the grammar is memoized, the
+        memo table only lives for this call.
+        """
+
+        if self.memo is None:
+            return self.root.parseString(query)
+
+        self.memo.table = {}
+        try:
+            return self.root.parseString(query)
+        finally:
+            self.memo.table = None
+
+
+def build(memoize=False):
+    """
+    Builds a new, independent copy of the GraphQL grammar.
+
+    With `memoize`, the grammar remembers the result of parsing at each
+    position while a query is parsed, like pyparsing's packrat mode, but
+    without enabling it globally.
+    """
+
+    OPEN_BRACE = pp.Suppress('{')
+    CLOSE_BRACE = pp.Suppress('}')
+    OPEN_PAREN = pp.Suppress('(')
+    CLOSE_PAREN = pp.Suppress(')')
+    COMMA = pp.Suppress(',')
+    COLON = pp.Suppress(':')
+    DOT = pp.Suppress('.')
+    EOF = pp.StringEnd()
+
+    # The query starts a line: either the text starts with the opening
+    # brace, or the whitespace before it has a line break.
+    START = pp.Suppress(pp.Regex(r'(?=\{)|[ \t\r]*\n').leaveWhitespace().setName('start of line'))
+
+    identifier = pp.Regex(r'[a-zA-Z_][a-zA-Z0-9_/]*').setName('identifier')
+
+    string = pp.quotedString.copy().setName('quoted string')
+    number = pp.Regex(r'-?\d+(\.\d+)?').setName('number')
+    # Whole words, or `nullable: 1` would start with the literal `null`
+    constant = pp.Regex(r'(?:null|true|false)(?![a-zA-Z0-9_/])')
+    literal = (number | string | constant).setName('literal')
+
+    param = pp.Group(identifier + COLON + literal).setName('param')
+    param_pairs_list = (param + pp.ZeroOrMore(COMMA + param))
+    params_list = ( OPEN_PAREN
+                  + pp.Optional(param_pairs_list | literal)
+                  + CLOSE_PAREN).setName('params list')
+
+    filter_param = pp.Group(identifier + params_list).setName('filter param')
+
+    gql_header = ( identifier
+                 + pp.Optional(pp.Group(params_list).setResultsName('params'))
+                 + pp.Group(pp.ZeroOrMore(DOT + filter_param)).setResultsName('filters'))
+
+    gql_object = pp.Forward()
+    gql_property = pp.Group(gql_object) | identifier
+    gql_properties_list = gql_property + pp.ZeroOrMore(COMMA + gql_property)
+    gql_object << ( pp.Group(gql_header).setResultsName('header')
+                  + OPEN_BRACE
+                  + pp.Group(gql_properties_list).setResultsName('properties')
+                  + CLOSE_BRACE)
+
+    gql_objects_list = pp.Group(gql_object) + pp.ZeroOrMore(COMMA + pp.Group(gql_object))
+    root = START + OPEN_BRACE + gql_objects_list + CLOSE_BRACE + EOF
+
+    # pyparsing streamlines a grammar the first time it parses with it,
+    # which isn't safe while other threads parse with it too.
+    root.streamline()
+
+    grammar = Grammar(locals())
+    if memoize:
+        enable_memo(grammar)
+
+    return grammar
+
+
+# Only elements that alternatives retry at the same position can be found
+# in the memo table. In this grammar that's just `identifier`: a leaf property
+# is first tried as a `gql_object`. Memoizing
+# every element, as packrat mode does, only adds overhead and stack depth.
+MEMOIZED = ('identifier',)
+
+
+def enable_memo(grammar, names=MEMOIZED):
+    """
+    Replaces the parse method of the elements called `names` with a
+    memoizing one. The memo table is per thread and is only set while
+    `Grammar.parse` runs.
+    """
+
+    grammar.memo = threading.local()
+    grammar.memo.table = None
+
+    for name in names:
+        element = getattr(grammar, name)
+        element._parse = memo_parser(element, grammar.memo)
+
+
+def memo_parser(element, memo):
+    parse = element._parseNoCache
+    pre_parse = element.preParse
+    key_id = id(element)
+
+    def _parse(instring, loc, doActions=True, callPreParse=True):
+        table = getattr(memo, 'table', None)
+        if table is None:
+            return parse(instring, loc, doActions, callPreParse)
+
+        # Alternatives retry an element at the same place, but not always
+        # with the same `callPreParse`, so key on the place after whitespace.
+        if callPreParse:
+            loc = pre_parse(instring, loc)
+
+        key = (key_id, loc, doActions)
+        try:
+            value = table[key]
+        except KeyError:
+            pass
+        else:
+            if isinstance(value, Exception):
+                raise value
+            return value[0], value[1].copy()
+
+        try:
+            value = parse(instring, loc, doActions, False)
+        except pp.ParseBaseException as pe:
+            table[key] = pe
+            raise
+
+        table[key] = (value[0], value[1].copy())
+        return value
+
+    return _parse
+
+
+_memoized = None
+_memoized_lock = threading.Lock()
 
-identifier = pp.Regex(r'[a-zA-Z_][a-zA-Z0-9_/]*').setName('identifier')
 
-string = pp.quotedString.setName('quoted string')
-number = pp.Regex(r'-?\d+(\.\d+)?').setName('number')
-literal = (number | string | "null" | "true" | "false").setName('literal')
+def memoized():
+    """
+    Returns the shared memoized grammar, building it on first use.
+    """
 
-param = pp.Group(identifier + COLON + literal).setName('param')
-param_pairs_list = (param + pp.ZeroOrMore(COMMA + param))
-params_list = ( OPEN_PAREN
-              + pp.Optional(literal | param_pairs_list)
-              + CLOSE_PAREN).setName('params list')
+    global _memoized
+    if _memoized is None:
+        with _memoized_lock:
+            if _memoized is None:
+                _memoized = build(memoize=True)
 
-filter_param = pp.Group(identifier + params_list).setName('filter param')
+    return _memoized
 
-gql_header = ( identifier
-             + pp.Optional(pp.Group(params_list).setResultsName('params'))
-             + pp.Group(pp.ZeroOrMore(DOT + filter_param)).setResultsName('filters'))
 
-gql_object = pp.Forward()
-gql_property = pp.Group(gql_object) | identifier
-gql_properties_list = gql_property + pp.ZeroOrMore(COMMA + gql_property)
-gql_object << ( pp.Group(gql_header).setResultsName('header')
-              + OPEN_BRACE
-              + pp.Group(gql_properties_list).setResultsName('properties')
-              + CLOSE_BRACE)
+default = build()
 
-gql_objects_list = pp.Group(gql_object) + pp.ZeroOrMore(COMMA + pp.Group(gql_object))
-root = pp.Suppress(pp.LineStart()) + OPEN_BRACE + gql_objects_list + CLOSE_BRACE + EOF
+# The elements of the default grammar, e.g. `grammar.root`
+globals().update((name, element) for name, element in vars(default).items()
+                 if isinstance(element, pp.ParserElement))
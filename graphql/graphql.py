@@ -1,17 +1,57 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+import threading
 import six
-import json
-import pyparsing as pp
-from . import grammar
+from . import analysis, instrumentation, parser
+from .parser import IncrementalParser, decode
+from .cache import QueryCache, copy_ast
+from .encoder import Encoder
+from .nodes import from_dicts
 
-__all__ = ['loads', 'dumps']
+__all__ = ['loads', 'loads_many', 'load', 'iterload', 'dumps', 'dump', 'iterdumps',
+           'Parser', 'Encoder', 'QueryCache', 'IncrementalParser']
 
+ENGINES = ('pyparsing', 'fast')
 
-def loads(query):
+# The pyparsing grammar recurses about a dozen frames per level of nesting,
+# so a query much deeper than this would hit the default recursion limit,
+# after having gone through most of it.
+PYPARSING_MAX_DEPTH = 64
+
+
+def loads(query, engine='pyparsing', cache=None, nodes=False, memoize=False, limits=None,
+          rules=None):
     """
     Converts a GraphQL string into a Python dictionary.
 
+    `engine` selects the parser: ``"pyparsing"`` (the reference grammar in
+    `graphql.grammar`) or ``"fast"`` (the hand-written parser in
+    `graphql.parser`). Both return the same structure.
+
+    If a `graphql.QueryCache` is given as `cache`, queries already in it
+    aren't parsed again.
+
+    With `nodes`, objects are returned as the compact classes from
+    `graphql.nodes` instead of dicts.
+
+    `memoize` makes the pyparsing engine remember partial results while
+    parsing, so it doesn't parse the same piece of the query twice when it
+    backtracks. Unlike pyparsing's packrat mode, it only applies to this
+    grammar and nothing outlives the call.
+
+    `limits` is a dict with the maximum ``bytes`` (length), ``depth``,
+    number of ``fields`` (objects included), ``tokens`` and top-level
+    ``objects`` of the query. Parsing stops with a
+    `graphql.analysis.LimitExceeded` as soon as one is exceeded. The fast
+    engine checks them as it goes, the pyparsing one before it starts.
+    The pyparsing grammar is recursive, so it never takes queries deeper
+    than `PYPARSING_MAX_DEPTH` unless a larger ``depth`` is given.
+
+    The pyparsing engine parses with the grammar shared by the whole
+    process, or with `rules`, one made by `graphql.grammar.build`.
+
+    Calls are timed for the hooks of `graphql.instrumentation`, if any.
+
     >>> graphql.loads(\"\"\"
     {
         user(id: 232) {
@@ -32,20 +72,240 @@ def loads(query):
         }
     ]
     """
-    
-    data = []
 
-    for parsed_obj in grammar.root.parseString(query):
-        data.append(load_obj(parsed_obj))
+    if not instrumentation.HOOKS:
+        return parse_query(query, engine, cache, nodes, memoize, limits, rules)
+
+    event = instrumentation.Event('loads', engine)
+    event.size = len(query)
+    try:
+        data = parse_query(query, engine, cache, nodes, memoize, limits, rules, event)
+    except Exception as e:
+        event.finish(e)
+        instrumentation.emit(event)
+        raise
+
+    event.finish()
+    if event.nodes is None:
+        event.nodes = instrumentation.count_nodes(data)
+    if event.tokens is None and event.cache is not True:
+        event.tokens = len(parser.tokenize(query))
+    instrumentation.emit(event)
+
+    return data
+
+
+def parse_query(query, engine, cache, nodes, memoize, limits, rules, event=None):
+    """
+    Does what `loads` says, timing each phase in `event` if given.
+    """
 
+    if cache is not None:
+        if limits is not None:
+            analysis.check(query, limits)
+            if event is not None:
+                event.lap('check')
+
+        data = cache.get(query)
+        if event is not None:
+            event.cache = data is not None
+
+        if data is None:
+            data = parse_query(query, engine, None, False, memoize, None, rules, event)
+            cache.put(query, data)
+
+        return from_dicts(data) if nodes else data
+
+    if engine == 'fast':
+        if event is None:
+            return parser.parse(query, nodes, limits)
+
+        stats = {}
+        data = parser.parse(query, nodes, limits, stats)
+        event.lap('parse')
+        event.tokens, event.nodes = stats['tokens'], stats['fields']
+        return data
+    elif engine != 'pyparsing':
+        raise ValueError('Unknown engine %r, expected one of %r' % (engine, ENGINES))
+
+    # Only queries with enough braces can be too deep
+    if limits is not None or query.count('{') > PYPARSING_MAX_DEPTH:
+        limits = dict(limits or {})
+        limits.setdefault('depth', PYPARSING_MAX_DEPTH)
+        analysis.check(query, limits)
+        if event is not None:
+            event.lap('check')
+
+    if rules is None:
+        # pyparsing is slow to import and the grammar slow to build, so
+        # both wait until the first query that needs them
+        from . import grammar
+        rules = grammar.memoized() if memoize else grammar.default
+
+    parsed = rules.parse(query)
+    if event is not None:
+        event.lap('parse')
+
+    data = [load_obj(parsed_obj) for parsed_obj in parsed]
+    if nodes:
+        data = from_dicts(data)
+
+    if event is not None:
+        event.lap('convert')
     return data
 
 
+def loads_many(queries, engine='pyparsing', cache=None, nodes=False):
+    """
+    Parses every query in `queries`, returning a list with the results in
+    the same order. Queries that fail to parse don't stop the batch: their
+    exception is put in the list instead.
+
+    Each distinct query is parsed only once per batch, the repeated ones get
+    a copy of the first result. With a `graphql.QueryCache` as `cache`,
+    results are shared with other batches and `loads` calls too.
+
+    Copying is much cheaper than parsing, so the more repetitive the batch
+    the bigger the gain over calling `loads` in a loop: with the default
+    engine, a batch where each query appears 10 times is parsed close to 10x
+    faster. A batch of distinct queries takes the same time as the loop.
+    """
+
+    # Checked up front, or every query would get the error as its result
+    if engine not in ENGINES:
+        raise ValueError('Unknown engine %r, expected one of %r' % (engine, ENGINES))
+
+    errors = parse_errors(engine)
+    parsed = {}
+    results = []
+
+    for query in queries:
+        try:
+            data = parsed[query]
+        except KeyError:
+            try:
+                data = loads(query, engine, cache)
+            except errors as e:
+                data = e
+            parsed[query] = data
+        else:
+            if not isinstance(data, Exception):
+                data = copy_ast(data)
+
+        if nodes and not isinstance(data, Exception):
+            data = from_dicts(data)
+
+        results.append(data)
+
+    return results
+
+
+class Parser(object):
+    """
+    Parses queries with the same options as `loads`, fixed when it's
+    created. With the pyparsing engine, it has a grammar of its own, built
+    on first use, so its options, like `debug`, which prints every match
+    attempt of the grammar, don't change how other parsers or `loads`
+    parse.
+
+    A parser is safe to share between threads, and doesn't lock anything
+    once its grammar is built: parsing doesn't change the grammar, the
+    memo table of a memoized one is per thread, and a `graphql.QueryCache`
+    locks itself. So is `loads`, whose grammar is built complete, but
+    `graphql.grammar.set_debug` changes the grammar `loads` shares with
+    every thread.
+
+    >>> parser = graphql.Parser(engine='fast', limits={'depth': 10})
+    >>> parser.loads('{ user(id: 232) { id, name } }')
+    """
+
+    def __init__(self, engine='pyparsing', cache=None, nodes=False, memoize=False, limits=None,
+                 debug=False):
+        if engine not in ENGINES:
+            raise ValueError('Unknown engine %r, expected one of %r' % (engine, ENGINES))
+
+        self.engine = engine
+        self.cache = cache
+        self.nodes = nodes
+        self.memoize = memoize
+        self.limits = dict(limits) if limits is not None else None
+        self.debug = debug
+        self._grammar = None
+        self._lock = threading.Lock()
+
+    @property
+    def grammar(self):
+        """
+        The grammar of the pyparsing engine, built on first use.
+        """
+
+        if self._grammar is None:
+            with self._lock:
+                if self._grammar is None:
+                    from . import grammar
+
+                    rules = grammar.build(self.memoize)
+                    if self.debug:
+                        rules.root.setDebug(True)
+                    self._grammar = rules
+
+        return self._grammar
+
+    def loads(self, query):
+        """
+        Parses a query, like `loads`.
+        """
+
+        rules = self.grammar if self.engine == 'pyparsing' else None
+        return loads(query, self.engine, self.cache, self.nodes, self.memoize, self.limits, rules)
+
+
+def parse_errors(engine):
+    """
+    Returns the exceptions `loads` raises for invalid queries with `engine`.
+    """
+
+    if engine == 'pyparsing':
+        import pyparsing as pp
+        return (ValueError, pp.ParseBaseException)
+
+    return (ValueError,)
+
+
+def load(fp, nodes=False, chunk_size=65536):
+    """
+    Like `loads`, but reads the query from the file-like object `fp`.
+    It's read in chunks with an `IncrementalParser`, so only the top-level
+    object being parsed is kept in memory, besides the result.
+    """
+
+    return list(iterload(fp, nodes, chunk_size))
+
+
+def iterload(fp, nodes=False, chunk_size=65536):
+    """
+    Like `load`, but yields each top-level object as soon as it's parsed.
+    """
+
+    incremental = IncrementalParser(nodes)
+
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            break
+
+        for obj in incremental.feed(chunk):
+            yield obj
+
+    incremental.close()
+
+
 def dumps(ast, compact=False, indent=2):
     """
     Converts a Python dict representing a GraphQL structure to
     its string form. The `compact` argument is a shorthand for `indent=0`,
     so `graphql.dumps(x, compact=True) == graphql.dumps(x, indent=0)`.
+    Objects from `graphql.nodes` can be used in place of dicts.
 
     >>> graphql.dumps([
         {
@@ -65,57 +325,67 @@ def dumps(ast, compact=False, indent=2):
         }
     }
     """
-    
-    if compact:
-        indent = 0
-    
-    chunks = ['{']
-    if indent > 0:
-        chunks.append('\n')
 
-    for obj in ast:
-        chunks.extend(dump_object(obj, indent))
-        chunks.append(',\n\n' if indent > 0 else ',')
+    if not instrumentation.HOOKS:
+        return get_encoder(compact, indent).encode(ast)
 
-    chunks.pop(-1)  # remove the last comma
-    if indent > 0:
-        chunks.append('\n')
-    chunks.append('}')
+    event = instrumentation.Event('dumps')
+    try:
+        text = get_encoder(compact, indent).encode(ast)
+    except Exception as e:
+        event.finish(e)
+        instrumentation.emit(event)
+        raise
 
-    return ''.join(chunks)
+    event.lap('encode')
+    event.finish()
+    event.size = len(text)
+    event.nodes = instrumentation.count_nodes(ast)
+    instrumentation.emit(event)
 
+    return text
 
-def dump_object(obj, indent, indent_level=1):
+
+def dump(ast, fp, compact=False, indent=2):
     """
-    Converts a python object to a GraphQL string
+    Like `dumps`, but writes the result to the file-like object `fp`
+    piece by piece, without building the whole string.
     """
-    
-    is_compact = indent == 0
-    chunks = [] if is_compact else [' ' * indent * indent_level]
 
-    chunks.append(obj['name'])
+    for chunk in get_encoder(compact, indent).iterencode(ast):
+        fp.write(chunk)
+
+
+def iterdumps(ast, compact=False, indent=2):
+    """
+    Like `dumps`, but yields the result in chunks.
+    """
 
-    if 'params' in obj:
-        chunks.extend(dump_params(obj['params'], is_compact))
+    return get_encoder(compact, indent).iterencode(ast)
 
-    if 'filters' in obj:
-        for filter_name, params in iter(obj['filters'].items()):
-            chunks.extend(['.', filter_name])
-            chunks.extend(dump_params(params, is_compact))
 
-    if 'properties' in obj:
-        chunks.append('{' if is_compact else ' {\n')
+# Shared encoders for `dumps` and friends, by indent. They don't cache
+# strings, which would keep those of every query ever dumped.
+ENCODERS = {}
 
-        for prop in obj['properties']:
-            chunks.extend(dump_object(prop, indent, indent_level + 1))
-            chunks.append(',' if is_compact else ',\n')
 
-        chunks.pop(-1)  # remove the last comma
-        if is_compact:
-            chunks.append('}')
-        else:
-            chunks.extend(['\n', ' ' * indent * indent_level, '}'])
+def get_encoder(compact, indent):
+    if compact:
+        indent = 0
+
+    try:
+        return ENCODERS[indent]
+    except KeyError:
+        return ENCODERS.setdefault(indent, Encoder(indent, cache_strings=False))
 
+
+def dump_object(obj, indent, indent_level=1):
+    """
+    Converts a python object to a GraphQL string
+    """
+
+    chunks = []
+    get_encoder(False, indent).encode_object(obj, chunks, indent_level)
     return chunks
 
 
@@ -123,27 +393,39 @@ def dump_params(params, compact):
     """
     Converts list of params to a GraphQL representation.
     """
-    
-    SEP = ': ' if not compact else ':'
-
-    if not isinstance(params, dict):
-        return ['(', json.dumps(params), ')']
 
-    chunks = ['(']
-    for k, v in iter(params.items()):
-        chunks.extend([k, SEP, json.dumps(v)])
-    chunks.append(')')
-    
-    return chunks
+    return [get_encoder(compact, 2).encode_params(params)]
 
 
 def load_obj(parsed_obj):
     """
-    Converts a parsed GraphQL object into a Python dict
+    Converts a parsed GraphQL object into a Python dict. Nested objects
+    are kept in an explicit stack instead of recursing.
     """
-    
+
+    obj = load_header(parsed_obj)
+    stack = [(obj['properties'], get_properties(parsed_obj))]
+
+    while stack:
+        properties, parsed_properties = stack.pop()
+        for p in parsed_properties:
+            if isinstance(p, six.string_types):
+                properties.append({'name': p})
+            else:
+                prop = load_header(p)
+                properties.append(prop)
+                stack.append((prop['properties'], get_properties(p)))
+
+    return obj
+
+
+def load_header(parsed_obj):
+    """
+    Converts the header of a parsed object into a dict with an empty list
+    of properties.
+    """
+
     name, params, filters = get_header(parsed_obj)
-    properties = get_properties(parsed_obj)
 
     obj = {'name': name}
     if params:
@@ -154,12 +436,6 @@ def load_obj(parsed_obj):
                            for filter_ in filters]
 
     obj['properties'] = []
-    for p in properties:
-        if isinstance(p, pp.ParseResults):
-            obj['properties'].append(load_obj(p))
-        else:
-            obj['properties'].append({'name': p})
-
     return obj
 
 
@@ -169,18 +445,10 @@ def load_args(args):
     """
     
     if len(args) == 1 and isinstance(args[0], six.string_types):
-        return json.loads(args[0])
-
-    parsed_args = {}
-    for arg in args:
-        if not isinstance(arg, list):
-            arg = arg.asList()
-
-        param = arg[0]
-        arguments = arg[1:]
-        parsed_args[param] = json.loads(arguments[0])
+        return decode(args[0])
 
-    return parsed_args
+    # Each arg is a ``[name, literal]`` group
+    return dict((arg[0], decode(arg[1])) for arg in args)
 
 
 def get_header(obj):
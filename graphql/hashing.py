@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Structural fingerprints of queries.
+
+Two queries have the same fingerprint if `graphql.loads` returns the same
+thing for both, whatever their whitespace or the order of their params.
+With ``literals=False``, the values of the params are left out too, so
+the fingerprint identifies the shape of the query.
+
+>>> graphql.fingerprint('{ user(id: 232, name: "x") { id } }')
+'...'
+>>> graphql.fingerprint(graphql.loads('{ user(name: "x", id: 232) {id} }'))
+'...'  # the same
+"""
+from __future__ import unicode_literals
+import hashlib
+import six
+from . import parser
+from .encoder import Encoder
+
+__all__ = ['fingerprint', 'canonicalize']
+
+
+def fingerprint(ast_or_query, literals=True):
+    """
+    Returns the SHA-1 hex digest of the canonical form of a query, given
+    as a string or as the AST `graphql.loads` returns (dicts or nodes).
+    It's the same across processes and Python versions.
+    """
+
+    return hashlib.sha1(canonicalize(ast_or_query, literals).encode('utf-8')).hexdigest()
+
+
+def canonicalize(ast_or_query, literals=True):
+    """
+    Returns the canonical form of a query: its compact form with the
+    params of every object and filter sorted by name, and, without
+    `literals`, ``?`` in place of every value.
+    """
+
+    if isinstance(ast_or_query, six.string_types):
+        ast_or_query = parser.parse(ast_or_query)
+
+    return (CANONICAL if literals else SHAPE).encode(ast_or_query)
+
+
+class CanonicalEncoder(Encoder):
+    """
+    Compact encoder that sorts params, and can leave out their values.
+    """
+
+    def __init__(self, literals=True):
+        super(CanonicalEncoder, self).__init__(compact=True)
+        self.literals = literals
+
+    def encode_params(self, params):
+        if not isinstance(params, dict):
+            return '(' + self.encode_value(params) + ')'
+
+        encode_value = self.encode_value
+        return '(' + ','.join(
+            [key + ':' + encode_value(params[key]) for key in sorted(params)]) + ')'
+
+    def encode_value(self, value):
+        if not self.literals:
+            return '?'
+
+        return super(CanonicalEncoder, self).encode_value(value)
+
+
+CANONICAL = CanonicalEncoder()
+SHAPE = CanonicalEncoder(literals=False)
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Timings and counts of `graphql.loads` and `graphql.dumps` calls.
+
+Once a hook is added, every call creates an `Event`, with the time spent
+in each phase, and hands it to the hooks:
+
+>>> stats = graphql.instrumentation.Stats()
+>>> graphql.instrumentation.add_hook(stats)
+>>> graphql.loads('{ user(id: 232) { id, name } }')
+>>> stats.time
+Counter({('loads', 'parse'): 0.0021, ('loads', 'convert'): 0.0001})
+
+`MetricsHook` sends events to a metrics client, as counters and
+histograms. Without hooks, all `loads` and `dumps` do is check that there
+are none.
+"""
+from __future__ import unicode_literals
+from collections import Counter
+from contextlib import contextmanager
+import threading
+from timeit import default_timer as clock
+
+__all__ = ['Event', 'Stats', 'MetricsHook', 'add_hook', 'remove_hook', 'hooked']
+
+# Replaced, not changed, when hooks are added or removed, so calls going
+# through it while another thread does that aren't affected.
+HOOKS = ()
+
+_hooks_lock = threading.Lock()
+
+
+def add_hook(hook):
+    """
+    Calls `hook` with the `Event` of every `loads` and `dumps` call, in
+    the thread that made it, once it's done. Exceptions it raises aren't
+    caught.
+    """
+
+    global HOOKS
+    with _hooks_lock:
+        HOOKS = HOOKS + (hook,)
+
+
+def remove_hook(hook):
+    global HOOKS
+    with _hooks_lock:
+        hooks = list(HOOKS)
+        hooks.remove(hook)
+        HOOKS = tuple(hooks)
+
+
+@contextmanager
+def hooked(hook):
+    """
+    Adds `hook` for the duration of a ``with`` block.
+    """
+
+    add_hook(hook)
+    try:
+        yield hook
+    finally:
+        remove_hook(hook)
+
+
+def emit(event):
+    for hook in HOOKS:
+        hook(event)
+
+
+class Event(object):
+    """
+    A `loads` or `dumps` call, its `operation`:
+
+    - `engine`: the engine `loads` used, None for `dumps`.
+    - `size`: the length of the query, parsed or dumped.
+    - `phases`: the seconds spent in each phase, by name: ``check`` for
+      the limits, ``parse`` and, with the pyparsing engine, ``convert``
+      for turning its results into dicts. ``encode`` for `dumps`.
+    - `duration`: the seconds the whole call took.
+    - `tokens`: the number of tokens of the query, None if it wasn't
+      parsed.
+    - `nodes`: the number of objects and fields in the AST.
+    - `cache`: whether the query was found in the cache, None without one.
+    - `error`: the exception raised, if any.
+
+    The counts aren't part of the timings.
+    """
+
+    __slots__ = ('operation', 'engine', 'size', 'phases', 'duration', 'tokens', 'nodes',
+                 'cache', 'error', '_start', '_last')
+
+    def __init__(self, operation, engine=None):
+        self.operation = operation
+        self.engine = engine
+        self.size = None
+        self.phases = {}
+        self.duration = None
+        self.tokens = None
+        self.nodes = None
+        self.cache = None
+        self.error = None
+        self._start = self._last = clock()
+
+    def lap(self, phase):
+        """
+        Adds the time since the previous lap, or the start, to `phase`.
+        """
+
+        now = clock()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self._last
+        self._last = now
+
+    def finish(self, error=None):
+        self.duration = clock() - self._start
+        self.error = error
+
+    def __repr__(self):
+        return 'Event(%r, duration=%r, phases=%r)' % (self.operation, self.duration, self.phases)
+
+
+def count_nodes(ast):
+    """
+    Returns the number of objects and fields in an AST, dicts or nodes.
+    """
+
+    count = 0
+    stack = [ast]
+    while stack:
+        properties = stack.pop()
+        count += len(properties)
+        for obj in properties:
+            nested = obj.get('properties') if isinstance(obj, dict) else obj.properties
+            if nested:
+                stack.append(nested)
+
+    return count
+
+
+class Stats(object):
+    """
+    A hook adding up events, by operation: the number of `calls` and
+    `errors`, the `time` spent in each phase, by ``(operation, phase)``,
+    and the total `size`, `tokens` and `nodes`. `cache_hits` and
+    `cache_misses` count `loads` calls with a cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = Counter()
+            self.errors = Counter()
+            self.time = Counter()
+            self.size = Counter()
+            self.tokens = Counter()
+            self.nodes = Counter()
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    def __call__(self, event):
+        operation = event.operation
+
+        with self._lock:
+            self.calls[operation] += 1
+            if event.error is not None:
+                self.errors[operation] += 1
+
+            for phase, seconds in event.phases.items():
+                self.time[operation, phase] += seconds
+
+            self.size[operation] += event.size or 0
+            self.tokens[operation] += event.tokens or 0
+            self.nodes[operation] += event.nodes or 0
+
+            if event.cache is True:
+                self.cache_hits += 1
+            elif event.cache is False:
+                self.cache_misses += 1
+
+
+class MetricsHook(object):
+    """
+    A hook sending events to `sink`, any object with the methods
+    ``increment(name, value, tags)`` and ``histogram(name, value, tags)``,
+    like most statsd and Prometheus clients with a thin wrapper. Metric
+    names are ``<prefix>.<operation>.<metric>``, and the tags are a dict
+    with the ``engine``, if any.
+
+    Counters: ``calls``, ``errors``, ``cache_hits`` and ``cache_misses``.
+    Histograms: ``duration`` and each phase, in seconds, ``size``,
+    ``tokens`` and ``nodes``.
+    """
+
+    def __init__(self, sink, prefix='graphql'):
+        self.sink = sink
+        self.prefix = prefix
+
+    def __call__(self, event):
+        name = '%s.%s.' % (self.prefix, event.operation)
+        tags = {'engine': event.engine} if event.engine is not None else {}
+        sink = self.sink
+
+        sink.increment(name + 'calls', 1, tags)
+        if event.error is not None:
+            sink.increment(name + 'errors', 1, tags)
+        if event.cache is not None:
+            sink.increment(name + ('cache_hits' if event.cache else 'cache_misses'), 1, tags)
+
+        sink.histogram(name + 'duration', event.duration, tags)
+        for phase, seconds in event.phases.items():
+            sink.histogram(name + phase, seconds, tags)
+
+        for metric in ('size', 'tokens', 'nodes'):
+            value = getattr(event, metric)
+            if value is not None:
+                sink.histogram(name + metric, value, tags)
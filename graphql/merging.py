@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Merging queries, to send many of them upstream as a single one.
+
+Objects with the same name, params and filters are merged into one, with
+the union of their properties, at every level. A top-level object is only
+merged into another if that doesn't leave two different things under the
+same name, which the response couldn't tell apart, like a field and an
+object, or the same object with other params; it's kept apart otherwise:
+
+>>> merged = graphql.merge([
+...     graphql.loads('{ user(id: 232) { id, name } }'),
+...     graphql.loads('{ user(id: 232) { name, photo { url } } }'),
+... ])
+>>> graphql.dumps(merged.ast, compact=True)
+'{user(id:232){id,name,photo{url}}}'
+
+The response to the merged query is a list with the data of each of its
+top-level objects, where the data of an object is a dict of its
+properties (or a list of them, or None). `split` cuts it back into the
+response to each of the original queries:
+
+>>> merged.split([{'id': 232, 'name': 'Mary', 'photo': {'url': '...'}}])
+[[{'id': 232, 'name': 'Mary'}], [{'name': 'Mary', 'photo': {'url': '...'}}]]
+"""
+from __future__ import unicode_literals
+from .hashing import CANONICAL
+from .nodes import UNSET, name_of, properties_of
+from .project import compile
+
+__all__ = ['merge', 'Merged']
+
+
+def merge(asts):
+    """
+    Merges a list of ASTs (dicts or nodes) into a `Merged` query, whose
+    `ast` is in the dict form.
+    """
+
+    asts = list(asts)
+    merged = []
+    index = {}  # key -> [(position in `merged`, index of its properties)]
+    positions = []
+
+    for ast in asts:
+        ast_positions = []
+        for obj in ast:
+            candidates = index.setdefault(object_key(obj), [])
+            for position, properties_index in candidates:
+                if not conflicts(properties_index, obj):
+                    break
+            else:
+                position, properties_index = len(merged), ({}, {})
+                candidates.append((position, properties_index))
+                merged.append(copy_header(obj))
+
+            merge_properties(merged[position], properties_index, obj)
+            ast_positions.append(position)
+
+        positions.append(ast_positions)
+
+    return Merged(merged, asts, positions)
+
+
+class Merged(object):
+    """
+    A query made of others by `merge`. `ast` is the merged query, and
+    `positions` holds, for each original AST in `sources`, the position in
+    `ast` of each of its top-level objects.
+    """
+
+    __slots__ = ('ast', 'sources', 'positions')
+
+    def __init__(self, ast, sources, positions):
+        self.ast = ast
+        self.sources = sources
+        self.positions = positions
+
+    def split(self, response):
+        """
+        Splits the response to `ast`, a list with the data of each of its
+        top-level objects, into the response to each of `sources`, with
+        only what each of them asked for.
+        """
+
+        return [[compile(obj)(response[position])
+                 for position, obj in zip(positions, source)]
+                for positions, source in zip(self.positions, self.sources)]
+
+
+def merge_properties(merged_obj, index, obj):
+    """
+    Adds the properties of `obj` to those of `merged_obj`, which already
+    has the header of `obj`.
+
+    `index` is a pair of dicts about the properties of `merged_obj`: the
+    first maps the key of every property to None for fields, and for
+    objects, to the object and the index of its own properties. The second
+    maps their names to their key, or to None if there's more than one.
+    """
+
+    stack = [(merged_obj['properties'], index, properties_of(obj))]
+    while stack:
+        merged_properties, (keys, names), properties = stack.pop()
+
+        for prop in properties:
+            name, nested = name_of(prop), properties_of(prop)
+            key = object_key(prop) if nested is not None else name
+            if names.setdefault(name, key) != key:
+                names[name] = None
+
+            if nested is None:
+                if key not in keys:
+                    keys[key] = None
+                    merged_properties.append({'name': key})
+                continue
+
+            try:
+                merged_prop, prop_index = keys[key]
+            except KeyError:
+                merged_prop, prop_index = copy_header(prop), ({}, {})
+                keys[key] = (merged_prop, prop_index)
+                merged_properties.append(merged_prop)
+
+            stack.append((merged_prop['properties'], prop_index, nested))
+
+
+def conflicts(index, obj):
+    """
+    Returns whether merging `obj` into the object whose properties `index`
+    is about would put different properties under the same name.
+    """
+
+    stack = [(index, properties_of(obj))]
+    while stack:
+        (keys, names), properties = stack.pop()
+
+        seen = {}
+        for prop in properties:
+            name, nested = name_of(prop), properties_of(prop)
+            key = object_key(prop) if nested is not None else name
+            if seen.setdefault(name, key) != key or names.get(name, key) != key:
+                return True
+
+            if nested is not None and key in keys:
+                stack.append((keys[key][1], nested))
+
+    return False
+
+
+def object_key(obj):
+    """
+    Identifies objects that can be merged: same name, params and filters.
+    Fields are keyed on their name alone, so never match an object.
+    """
+
+    if isinstance(obj, dict):
+        name, params, filters = obj['name'], obj.get('params', UNSET), obj.get('filters')
+    else:
+        name, params, filters = obj.name, obj.params, obj.filters
+
+    key = [name]
+    if params is not UNSET:
+        key.append(CANONICAL.encode_params(params))
+
+    if filters:
+        if isinstance(filters, dict):
+            filters = filters.items()
+        for filter_name, filter_params in filters:
+            key.append('.' + filter_name + CANONICAL.encode_params(filter_params))
+
+    key.append('{')
+    return ''.join(key)
+
+
+def copy_header(obj):
+    """
+    Returns a dict with the name, params and filters of an object, and no
+    properties yet.
+    """
+
+    if isinstance(obj, dict):
+        name, params, filters = obj['name'], obj.get('params', UNSET), obj.get('filters')
+    else:
+        name, params, filters = obj.name, obj.params, obj.filters
+
+    copy = {'name': name}
+    if params is not UNSET:
+        copy['params'] = dict(params) if isinstance(params, dict) else params
+
+    if filters is not None:
+        if isinstance(filters, dict):
+            filters = filters.items()
+        copy['filters'] = [(filter_name, dict(filter_params) if isinstance(filter_params, dict)
+                            else filter_params)
+                           for filter_name, filter_params in filters]
+
+    copy['properties'] = []
+    return copy
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Compact node classes, an alternative to the dicts `graphql.loads` returns.
+
+A leaf field is a whole dict in the default form (``{"name": "id"}``);
+here it's a `Field` with a single slot. Use ``graphql.loads(query,
+nodes=True)`` to get nodes, and `from_dicts`/`to_dicts` to convert
+between both forms. `graphql.dumps` accepts either.
+"""
+from __future__ import unicode_literals
+from collections import namedtuple
+
+__all__ = ['UNSET', 'Object', 'Field', 'Filter',
+           'from_dict', 'from_dicts', 'to_dict', 'to_dicts']
+
+
+class Unset(object):
+    """
+    Type of `UNSET`, the value of `params` for objects without them,
+    since `None` is a valid value (``user(null)``).
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'UNSET'
+
+    def __reduce__(self):
+        # A native string, which Python 2's pickle requires
+        return str('UNSET')
+
+
+UNSET = Unset()
+
+
+class Object(object):
+    """
+    An object: ``name(params).filter(params)... { properties }``.
+
+    `filters` is a list of `Filter` and `properties` a list of `Object` and
+    `Field` nodes. Either can be `None` if absent.
+    """
+
+    __slots__ = ('name', 'params', 'filters', 'properties')
+
+    def __init__(self, name, params=UNSET, filters=None, properties=None):
+        self.name = name
+        self.params = params
+        self.filters = filters
+        self.properties = properties
+
+    def __eq__(self, other):
+        return (isinstance(other, Object) and
+                self.name == other.name and
+                self.params == other.params and
+                self.filters == other.filters and
+                self.properties == other.properties)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Object(%r, params=%r, filters=%r, properties=%r)' % (
+            self.name, self.params, self.filters, self.properties)
+
+
+class Field(object):
+    """
+    A leaf field, just a name. Shares the attributes of `Object` so both
+    can be read the same way.
+    """
+
+    __slots__ = ('name',)
+
+    params = UNSET
+    filters = None
+    properties = None
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Field) and self.name == other.name
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Field(%r)' % self.name
+
+
+Filter = namedtuple('Filter', 'name params')
+
+
+def from_dict(obj):
+    """
+    Converts an object in the dict form into a node.
+    """
+
+    if 'properties' not in obj and 'params' not in obj and 'filters' not in obj:
+        return Field(obj['name'])
+
+    filters = obj.get('filters')
+    if filters is not None:
+        if isinstance(filters, dict):
+            filters = filters.items()
+        filters = [Filter(name, params) for name, params in filters]
+
+    properties = obj.get('properties')
+    if properties is not None:
+        properties = [from_dict(prop) for prop in properties]
+
+    return Object(obj['name'], obj.get('params', UNSET), filters, properties)
+
+
+def to_dict(node):
+    """
+    Converts a node into the dict form.
+    """
+
+    obj = {'name': node.name}
+
+    if node.params is not UNSET:
+        obj['params'] = node.params
+
+    if node.filters is not None:
+        obj['filters'] = [tuple(filter_) for filter_ in node.filters]
+
+    if node.properties is not None:
+        obj['properties'] = [to_dict(prop) for prop in node.properties]
+
+    return obj
+
+
+def from_dicts(ast):
+    return [from_dict(obj) for obj in ast]
+
+
+def to_dicts(ast):
+    return [to_dict(node) for node in ast]
+
+
+def name_of(obj):
+    return obj['name'] if isinstance(obj, dict) else obj.name
+
+
+def properties_of(obj):
+    return obj.get('properties') if isinstance(obj, dict) else obj.properties
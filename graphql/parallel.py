@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Parsing on a process pool, for bulk jobs that would otherwise be stuck on
+a single core.
+
+>>> from graphql import parallel
+>>> results = parallel.loads_many(queries, workers=4)
+"""
+from __future__ import unicode_literals
+import marshal
+import multiprocessing
+import pyparsing as pp
+from .graphql import loads_many as _loads_many
+from .cache import copy_ast
+from .nodes import from_dicts
+from .parser import ParseError
+
+__all__ = ['loads_many']
+
+# Kinds of errors sent back by the workers
+PARSE_ERROR, PYPARSING_ERROR, VALUE_ERROR = range(3)
+
+
+def loads_many(queries, workers=None, chunksize=256, engine='pyparsing',
+               nodes=False, pool=None):
+    """
+    Like `graphql.loads_many`, but parses on `workers` processes (all CPUs
+    by default). Queries are deduplicated first and sent out in chunks of
+    `chunksize`; results come back marshalled, a chunk at a time, which is
+    much cheaper than pickling them one by one.
+
+    Results keep the order of `queries`, and queries that fail to parse
+    get their exception in place. Pass a `multiprocessing.Pool` as `pool`
+    to reuse it across calls instead of starting a new one.
+    """
+
+    queries = list(queries)
+    unique = list(dict.fromkeys(queries))
+    chunks = [(unique[i:i + chunksize], engine)
+              for i in range(0, len(unique), chunksize)]
+
+    own_pool = pool is None
+    if own_pool:
+        pool = multiprocessing.Pool(workers)
+
+    try:
+        parsed = {}
+        for (chunk, _), data in zip(chunks, pool.imap(parse_chunk, chunks)):
+            for query, (ok, result) in zip(chunk, marshal.loads(data)):
+                parsed[query] = result if ok else rebuild_error(query, result)
+    finally:
+        if own_pool:
+            pool.close()
+            pool.join()
+
+    # Repeated queries get their own copy, as in `graphql.loads_many`
+    results = []
+    seen = set()
+    for query in queries:
+        data = parsed[query]
+        if query in seen and not isinstance(data, Exception):
+            data = copy_ast(data)
+        seen.add(query)
+
+        if nodes and not isinstance(data, Exception):
+            data = from_dicts(data)
+
+        results.append(data)
+
+    return results
+
+
+def parse_chunk(args):
+    """
+    Runs on the workers: parses a chunk of distinct queries and returns
+    the marshalled list of ``(ok, result or error)`` pairs.
+    """
+
+    queries, engine = args
+    results = []
+
+    for data in _loads_many(queries, engine):
+        if isinstance(data, ParseError):
+            results.append((False, (PARSE_ERROR, data.msg, data.loc)))
+        elif isinstance(data, pp.ParseBaseException):
+            results.append((False, (PYPARSING_ERROR, data.msg, data.loc)))
+        elif isinstance(data, Exception):
+            results.append((False, (VALUE_ERROR, str(data), None)))
+        else:
+            results.append((True, data))
+
+    return marshal.dumps(results)
+
+
+def rebuild_error(query, error):
+    kind, msg, loc = error
+
+    if kind == PARSE_ERROR:
+        return ParseError(msg, query, loc)
+    if kind == PYPARSING_ERROR:
+        return pp.ParseException(query, loc, msg)
+
+    return ValueError(msg)
@@ -0,0 +1,586 @@
+# -*- coding: utf-8 -*-
+"""
+Hand-written GraphQL parser.
+
+This is the ``fast`` engine for `graphql.loads`. It accepts the same
+queries as `graphql.grammar`: the opening brace must start a line, and
+only whitespace can follow the closing one. But it scans the query once
+with a single compiled regex and builds the list-of-dicts structure
+directly, without going through pyparsing's ``ParseResults``.
+"""
+from __future__ import unicode_literals
+import re
+from .nodes import UNSET, Object, Field, Filter
+
+__all__ = ['ParseError', 'LimitExceeded', 'IncrementalParser', 'check_start', 'parse', 'tokenize', 'is_literal', 'decode']
+
+
+# Same token definitions as `graphql.grammar`: punctuation, numbers,
+# pp.quotedString (both quote styles), identifiers. The last alternative
+# catches any other non-whitespace character so the parser can report it.
+TOKEN_PATTERN = r'''
+      [{}(),:.]
+    | -?\d+(?:\.\d+)?
+    | "(?:[^"\n\r\\]|(?:"")|(?:\\x[0-9a-fA-F]+)|(?:\\.))*"
+    | '(?:[^'\n\r\\]|(?:'')|(?:\\x[0-9a-fA-F]+)|(?:\\.))*'
+    | [a-zA-Z_][a-zA-Z0-9_/]*
+    | [^ \t\r\n]
+'''
+TOKEN_RE = re.compile(TOKEN_PATTERN, re.VERBOSE)
+
+# What `IncrementalParser` looks for inside an object: braces, and strings
+# (which may contain braces). A lone quote is an unterminated string.
+STRUCTURE_PATTERN = r'''
+      [{}]
+    | "(?:[^"\n\r\\]|(?:"")|(?:\\x[0-9a-fA-F]+)|(?:\\.))*"
+    | '(?:[^'\n\r\\]|(?:'')|(?:\\x[0-9a-fA-F]+)|(?:\\.))*'
+    | ["']
+'''
+STRUCTURE_RE = re.compile(STRUCTURE_PATTERN, re.VERBOSE)
+WHITESPACE_RE = re.compile(r'[ \t\r\n]*')
+
+NAME_START = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+CONSTANTS = frozenset(['null', 'true', 'false'])
+CONSTANT_VALUES = {'null': None, 'true': True, 'false': False}
+
+# Escapes inside quoted strings: JSON's, plus `\xHH`, `\'` and a doubled
+# quote (`"a""b"`), which `pp.quotedString` accepts too. A `\u` surrogate
+# pair is a single character.
+ESCAPES = {
+    'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f',
+    '/': '/', '\\': '\\', '"': '"', "'": "'",
+}
+ESCAPE_PATTERN = r'''
+      \\u(d[89ab][0-9a-f]{2})\\u(d[c-f][0-9a-f]{2})
+    | \\u([0-9a-f]{4})
+    | \\x([0-9a-f]{1,2})
+    | \\(.)
+    | (%s)
+'''
+ESCAPE_RES = {
+    '"': re.compile(ESCAPE_PATTERN % '""', re.VERBOSE | re.IGNORECASE | re.DOTALL),
+    "'": re.compile(ESCAPE_PATTERN % "''", re.VERBOSE | re.IGNORECASE | re.DOTALL),
+}
+
+try:
+    unichr
+except NameError:  # Python 3
+    unichr = chr
+
+# Pads the end of the token list, so lookaheads never go out of range.
+EOF = ''
+
+# Returned by `parse_params` for an empty `()`, which is not the same as `(null)`.
+EMPTY = object()
+
+# What can follow the name of an object, rather than a field
+OBJECT_START = frozenset(['(', '.', '{'])
+
+# Limits that can be checked while parsing: the length of the query, how
+# deep it's nested, its number of objects and fields, of tokens, and of
+# top-level objects.
+PARSE_LIMITS = ('bytes', 'depth', 'fields', 'tokens', 'objects')
+
+
+class ParseError(ValueError):
+    """
+    Raised when a query can't be parsed. Mirrors the attributes of
+    pyparsing's ``ParseException``: `msg`, `loc`, `lineno` and `col`.
+
+    `start` is the ``(loc, lineno, col)`` of `query` itself, for when it's
+    only a piece of a larger input.
+    """
+
+    def __init__(self, msg, query, loc, start=(0, 1, 1)):
+        lineno = query.count('\n', 0, loc) + 1
+        col = loc - (query.rfind('\n', 0, loc) + 1) + 1
+
+        self.msg = msg
+        self.loc = start[0] + loc
+        self.lineno = start[1] + lineno - 1
+        self.col = start[2] + col - 1 if lineno == 1 else col
+
+        super(ParseError, self).__init__(
+            '%s (at char %d), (line:%d, col:%d)' % (msg, self.loc, self.lineno, self.col))
+
+
+class LimitExceeded(ValueError):
+    """
+    Raised when a query goes over one of the limits it's checked against.
+    `limit` is the name of the limit, `maximum` its value, and `value` how
+    far the query had got when it was stopped.
+    """
+
+    def __init__(self, limit, maximum, value):
+        self.limit = limit
+        self.maximum = maximum
+        self.value = value
+
+        super(LimitExceeded, self).__init__(
+            'Query exceeds the %s limit of %s' % (limit, maximum))
+
+
+def get_limits(limits, names=PARSE_LIMITS):
+    """
+    Returns the values of the `names` limits in `limits`, a dict, after
+    making sure it has no others.
+    """
+
+    limits = limits or {}
+
+    unknown = set(limits) - set(names)
+    if unknown:
+        raise ValueError('Unknown limits %s, expected any of %r' % (
+            ', '.join(sorted(unknown)), names))
+
+    return [limits.get(name) for name in names]
+
+
+def tokenize(query):
+    """
+    Splits a query into a list of token strings, skipping whitespace.
+    """
+
+    return TOKEN_RE.findall(query)
+
+
+def check_start(query):
+    """
+    Raises `ParseError` unless the query starts a line, like the grammar
+    requires: the whitespace before its opening brace, if any, has to have
+    a line break.
+    """
+
+    start = WHITESPACE_RE.match(query).end()
+    if start and query.find('\n', 0, start) == -1:
+        raise ParseError('Expected start of line', query, 0)
+
+
+def parse(query, nodes=False, limits=None, stats=None):
+    """
+    Parses a GraphQL string into the same structure `graphql.loads` returns,
+    or into `graphql.nodes` if `nodes` is true.
+
+    `limits` maps any of `PARSE_LIMITS` to their maximum. They are checked
+    as the query is parsed, raising `LimitExceeded` as soon as one is
+    exceeded.
+
+    If `stats` is given, a dict, the number of ``tokens`` of the query,
+    and of ``fields`` (objects included), are stored in it.
+    """
+
+    max_bytes, max_depth, max_fields, max_tokens, max_objects = get_limits(limits)
+
+    if max_bytes is not None and len(query) > max_bytes:
+        raise LimitExceeded('bytes', max_bytes, len(query))
+
+    check_start(query)
+
+    tokens = tokenize(query)
+    if max_tokens is not None and len(tokens) > max_tokens:
+        raise LimitExceeded('tokens', max_tokens, len(tokens))
+    tokens.extend((EOF, EOF))
+
+    if tokens[0] != '{':
+        raise error(query, tokens, 0, "Expected '{'")
+
+    objects = []
+    fields = 0
+    i = 1
+    while True:
+        if max_objects is not None and len(objects) == max_objects:
+            raise LimitExceeded('objects', max_objects, len(objects) + 1)
+
+        obj, i, fields = parse_object(query, tokens, i, nodes, max_depth, max_fields, fields)
+        objects.append(obj)
+
+        tok = tokens[i]
+        i += 1
+        if tok == ',':
+            continue
+        if tok == '}':
+            break
+        raise error(query, tokens, i - 1, "Expected ',' or '}'")
+
+    if tokens[i] is not EOF:
+        raise error(query, tokens, i, 'Expected end of text')
+
+    if stats is not None:
+        stats['tokens'] = len(tokens) - 2
+        stats['fields'] = fields
+
+    return objects
+
+
+def parse_object(query, tokens, i, nodes=False, max_depth=None, max_fields=None, fields=0):
+    """
+    Parses an object (header and properties) starting at token `i`.
+    Returns the object, the index right after its closing brace, and
+    `fields` plus the number of objects and fields in it.
+
+    Nested objects are kept in an explicit stack instead of recursing, so
+    any nesting is fine unless it's deeper than `max_depth`. That, and
+    `max_fields`, raise `LimitExceeded` as soon as they are exceeded.
+    """
+
+    obj = None
+    properties = None
+    stack = []  # properties of the objects around `properties`
+
+    while True:
+        name = tokens[i]
+        if name[:1] not in NAME_START:
+            raise error(query, tokens, i, 'Expected identifier')
+
+        fields += 1
+        if max_fields is not None and fields > max_fields:
+            raise LimitExceeded('fields', max_fields, fields)
+
+        if properties is None or tokens[i + 1] in OBJECT_START:
+            # An object, its properties are one level deeper
+            depth = len(stack) + (2 if properties is None else 3)
+            if max_depth is not None and depth > max_depth:
+                raise LimitExceeded('depth', max_depth, depth)
+
+            prop, props, i = parse_header(query, tokens, i, nodes)
+            if properties is None:
+                obj = prop
+            else:
+                properties.append(prop)
+                stack.append(properties)
+
+            properties = props
+            continue
+
+        properties.append(Field(name) if nodes else {'name': name})
+        i += 1
+
+        # Move on to the next property, closing every finished object
+        while True:
+            tok = tokens[i]
+            i += 1
+            if tok == ',':
+                break
+            if tok != '}':
+                raise error(query, tokens, i - 1, "Expected ',' or '}'")
+            if not stack:
+                return obj, i, fields
+
+            properties = stack.pop()
+
+
+def parse_header(query, tokens, i, nodes=False):
+    """
+    Parses the header of an object (name, params and filters) starting at
+    token `i`, up to its opening brace. Returns the object, its still empty
+    list of properties, and the index of its first property.
+    """
+
+    name = tokens[i]
+    params = UNSET
+    filters = None
+    i += 1
+    tok = tokens[i]
+
+    if tok == '(':
+        params, i = parse_params(query, tokens, i + 1)
+        if params is EMPTY:
+            params = UNSET
+        tok = tokens[i]
+
+    if tok == '.':
+        filters = []
+        while tok == '.':
+            filter_name = tokens[i + 1]
+            if filter_name[:1] not in NAME_START:
+                raise error(query, tokens, i + 1, 'Expected identifier')
+            if tokens[i + 2] != '(':
+                raise error(query, tokens, i + 2, "Expected '('")
+
+            filter_params, i = parse_params(query, tokens, i + 3)
+            if filter_params is EMPTY:
+                filter_params = {}
+            filters.append(Filter(filter_name, filter_params) if nodes
+                           else (filter_name, filter_params))
+            tok = tokens[i]
+
+    if tok != '{':
+        raise error(query, tokens, i, "Expected '{'")
+
+    properties = []
+    if nodes:
+        return Object(name, params, filters, properties), properties, i + 1
+
+    obj = {'name': name}
+    if params is not UNSET:
+        obj['params'] = params
+    if filters is not None:
+        obj['filters'] = filters
+    obj['properties'] = properties
+
+    return obj, properties, i + 1
+
+
+def parse_params(query, tokens, i):
+    """
+    Parses the contents of a params list, starting right after its `(`.
+    Returns the params (`EMPTY` for `()`) and the index after the `)`.
+    """
+
+    tok = tokens[i]
+    if tok == ')':
+        return EMPTY, i + 1
+
+    if tokens[i + 1] == ':' and tok[:1] in NAME_START:
+        params = {}
+        while True:
+            if tok[:1] not in NAME_START:
+                raise error(query, tokens, i, 'Expected identifier')
+            if tokens[i + 1] != ':':
+                raise error(query, tokens, i + 1, "Expected ':'")
+
+            params[tok] = parse_literal(query, tokens, i + 2)
+
+            sep = tokens[i + 3]
+            i += 4
+            if sep == ')':
+                return params, i
+            if sep != ',':
+                raise error(query, tokens, i - 1, "Expected ',' or ')'")
+            tok = tokens[i]
+
+    value = parse_literal(query, tokens, i)
+    if tokens[i + 1] != ')':
+        raise error(query, tokens, i + 1, "Expected ')'")
+
+    return value, i + 2
+
+
+def parse_literal(query, tokens, i):
+    """
+    Converts the literal token at `i` into its Python value.
+    """
+
+    tok = tokens[i]
+    if is_literal(tok):
+        try:
+            return decode(tok)
+        except ValueError as e:
+            raise error(query, tokens, i, str(e))
+
+    raise error(query, tokens, i, 'Expected literal')
+
+
+def is_literal(tok):
+    """
+    Tells whether a token is a number, a quoted string, null, true or false.
+    """
+
+    first = tok[:1]
+    return first.isdigit() or tok in CONSTANTS or first in '-"\'' and len(tok) > 1
+
+
+def decode(tok):
+    """
+    Converts a literal token into its Python value: an int or a float for
+    numbers, a string for either quote style, or None, True or False.
+    """
+
+    first = tok[0]
+    if first == '"' or first == "'":
+        body = tok[1:-1]
+        if '\\' not in body and first not in body:
+            return body
+        return ESCAPE_RES[first].sub(unescape, body)
+
+    if first.isdigit() or first == '-':
+        return float(tok) if '.' in tok else int(tok)
+
+    try:
+        return CONSTANT_VALUES[tok]
+    except KeyError:
+        raise ValueError('Invalid literal %r' % tok)
+
+
+def unescape(match):
+    high, low, code, byte, char, quote = match.groups()
+
+    if high is not None:
+        return unichr(0x10000 + ((int(high, 16) - 0xd800) << 10) + int(low, 16) - 0xdc00)
+    if code is not None:
+        return unichr(int(code, 16))
+    if byte is not None:
+        return unichr(int(byte, 16))
+    if quote is not None:
+        return quote[0]
+
+    try:
+        return ESCAPES[char]
+    except KeyError:
+        raise ValueError('Invalid escape \\%s' % char)
+
+
+def error(query, tokens, i, msg):
+    """
+    Builds a `ParseError` for token `i`. Token offsets aren't tracked
+    while parsing, so the query is scanned again to find it.
+    """
+
+    loc = len(query)
+    for n, match in enumerate(TOKEN_RE.finditer(query)):
+        if n == i:
+            loc = match.start()
+            break
+
+    return ParseError(msg, query, loc)
+
+
+class IncrementalParser(object):
+    """
+    Parses a query fed in chunks, returning each top-level object as soon
+    as its closing brace is seen. Only the text of the object being read is
+    kept in memory.
+
+    >>> p = graphql.IncrementalParser()
+    >>> p.feed('{ user { id }, comp')
+    [{'name': 'user', 'properties': [{'name': 'id'}]}]
+    >>> p.feed('any { name } }')
+    [{'name': 'company', 'properties': [{'name': 'name'}]}]
+    >>> p.close()
+    """
+
+    def __init__(self, nodes=False):
+        self.nodes = nodes
+        self._buffer = ''
+        self._pos = 0       # where scanning resumes in the buffer
+        self._start = None  # where the current object starts in the buffer
+        self._depth = 0
+        self._state = 'start'
+        self._origin = (0, 1, 1)  # (loc, lineno, col) of the buffer in the input
+        self._newline = False  # whether the whitespace before the query has one
+
+    def feed(self, chunk):
+        """
+        Adds `chunk` to the input and returns the list of top-level objects
+        completed by it.
+        """
+
+        self._buffer += chunk
+        objects = []
+
+        while True:
+            if self._state == 'object':
+                obj = self._scan_object()
+                if obj is None:
+                    break
+                objects.append(obj)
+                continue
+
+            start = self._pos
+            self._pos = WHITESPACE_RE.match(self._buffer, self._pos).end()
+            if self._state == 'start' and self._buffer.find('\n', start, self._pos) != -1:
+                self._newline = True
+            if self._pos == len(self._buffer):
+                break
+
+            char = self._buffer[self._pos]
+            if self._state == 'start':
+                if char != '{':
+                    raise self._error("Expected '{'", self._pos)
+                if self._origin[0] + self._pos and not self._newline:
+                    # Like `check_start`, whitespace can have been discarded
+                    raise ParseError('Expected start of line', self._buffer, 0)
+                self._state = 'next'
+            elif self._state == 'next':
+                if char not in NAME_START:
+                    raise self._error('Expected identifier', self._pos)
+                self._state = 'object'
+                self._start = self._pos
+                continue
+            elif self._state == 'separator':
+                if char not in ',}':
+                    raise self._error("Expected ',' or '}'", self._pos)
+                self._state = 'next' if char == ',' else 'end'
+            else:
+                raise self._error('Expected end of text', self._pos)
+
+            self._pos += 1
+
+        self._discard(self._pos if self._start is None else self._start)
+        return objects
+
+    def close(self):
+        """
+        Signals the end of the input. Raises `ParseError` if it's incomplete.
+        """
+
+        if self._state != 'end':
+            self._pos = WHITESPACE_RE.match(self._buffer, self._pos).end()
+            raise self._error('Unexpected end of text', self._pos)
+
+    def _scan_object(self):
+        """
+        Looks for the end of the current object. Returns it, parsed, or
+        `None` if more input is needed.
+        """
+
+        buffer = self._buffer
+        for match in STRUCTURE_RE.finditer(buffer, self._pos):
+            tok = match.group()
+            if tok == '{':
+                self._depth += 1
+            elif tok == '}':
+                self._depth -= 1
+                if self._depth <= 0:
+                    end = match.end() if self._depth == 0 else match.start()
+                    return self._parse_object(end)
+            elif len(tok) == 1 and '\n' not in buffer[match.end():]:
+                # Might be a string cut in half, wait for the rest of it
+                self._pos = match.start()
+                return None
+
+        self._pos = len(buffer)
+        return None
+
+    def _parse_object(self, end):
+        text = self._buffer[self._start:end]
+        tokens = tokenize(text)
+        tokens.extend((EOF, EOF))
+
+        try:
+            obj, i, _ = parse_object(text, tokens, 0, self.nodes)
+            if tokens[i] is not EOF:
+                raise error(text, tokens, i, "Expected ',' or '}'")
+        except ParseError as e:
+            raise self._error(e.msg, self._start + e.loc)
+
+        self._pos = end
+        self._start = None
+        self._depth = 0
+        self._state = 'separator'
+        return obj
+
+    def _discard(self, n):
+        """
+        Drops the first `n` characters of the buffer, they're done.
+        """
+
+        if not n:
+            return
+
+        loc, lineno, col = self._origin
+        done = self._buffer[:n]
+        newlines = done.count('\n')
+        if newlines:
+            col = n - done.rfind('\n')
+        else:
+            col += n
+
+        self._origin = (loc + n, lineno + newlines, col)
+        self._buffer = self._buffer[n:]
+        self._pos -= n
+        if self._start is not None:
+            self._start -= n
+
+    def _error(self, msg, loc):
+        return ParseError(msg, self._buffer, loc, self._origin)
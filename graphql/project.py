@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Shaping data to what a query selects.
+
+`compile` turns a top-level object of a query into a `Projector`, a
+function generated for its properties that keeps only them in the data of
+the object, at every level. Going through the properties is done once,
+when the function is generated, instead of once for every row:
+
+>>> ast = graphql.loads('{ user { id, photo { url } } }')
+>>> users = graphql.project.compile(ast[0])
+>>> users.many([{'id': 232, 'name': 'Mary', 'photo': {'url': '...', 'width': 50}}])
+[{'id': 232, 'photo': {'url': '...'}}]
+
+Projectors are cached by the fingerprint of the shape of the object, so
+compiling the same object again, or another one with the same shape, is
+only a lookup.
+"""
+from __future__ import unicode_literals
+import keyword
+import re
+from six.moves import builtins
+from .cache import QueryCache
+from .hashing import fingerprint
+from .nodes import name_of, properties_of
+
+__all__ = ['compile', 'Projector']
+
+# Projectors are never mutated, so they don't need to be copied.
+PROJECTORS = QueryCache(max_entries=1024, copy=False)
+
+IDENTIFIER_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+
+# `%(index)d` is the index of the properties in `selections`, and
+# `%(item)s` the dict built for a row with them.
+FUNCTION = '''
+def _project%(index)d(row):
+    if row is None:
+        return None
+    if isinstance(row, list):
+        return [_project%(index)d(item) for item in row]
+    try:
+        return %(item)s
+    except LOOKUP_ERRORS:
+        return walk(row, selections[%(index)d], attributes)
+'''
+
+MANY = '''
+def _many(rows):
+    if not isinstance(rows, list):
+        rows = list(rows)
+    try:
+        return [%(item)s for row in rows]
+    except LOOKUP_ERRORS + (TypeError,):
+        return [_project0(row) for row in rows]
+'''
+
+# Nothing is selected below a field, so its data is kept as it is
+IDENTITY = '''
+def _project0(row):
+    return row
+
+def _many(rows):
+    return list(rows)
+'''
+
+
+def compile(obj, attributes=False, cache=PROJECTORS):
+    """
+    Returns the `Projector` for an object of an AST, dicts or nodes. Its
+    data is read as dicts, or with `attributes`, from the attributes of
+    any object. Projectors are kept in `cache`, a `graphql.QueryCache`
+    created with ``copy=False``.
+    """
+
+    key = fingerprint([obj], literals=False)
+    if attributes:
+        key += ':attributes'
+
+    projector = cache.get(key)
+    if projector is None:
+        projector = Projector(key, properties_of(obj), attributes)
+        cache.put(key, projector)
+
+    return projector
+
+
+class Projector(object):
+    """
+    Keeps the selected `properties` of the data of an object: a dict of
+    its properties, a list of them, or None. Properties missing from the
+    data are left out. Call it with the data of one object, or use `many`
+    for a list of rows, which runs a single loop over them.
+
+    `source` is the Python code generated for the properties.
+    """
+
+    __slots__ = ('fingerprint', 'properties', 'attributes', 'source', '_one', '_many')
+
+    def __init__(self, fingerprint, properties, attributes=False):
+        self.fingerprint = fingerprint
+        self.properties = properties
+        self.attributes = attributes
+        self.source, selections = generate(properties, attributes)
+
+        namespace = {
+            'walk': walk,
+            'selections': selections,
+            'attributes': attributes,
+            'LOOKUP_ERRORS': (AttributeError,) if attributes else (KeyError,),
+        }
+        code = builtins.compile(self.source, '<graphql.project %s>' % fingerprint, 'exec')
+        exec(code, namespace)
+
+        self._one = namespace['_project0']
+        self._many = namespace['_many']
+
+    def __call__(self, data):
+        return self._one(data)
+
+    def many(self, rows):
+        """
+        Returns the list of the projections of `rows`.
+        """
+
+        return self._many(rows)
+
+    def __repr__(self):
+        return 'Projector(%r)' % self.fingerprint
+
+
+def generate(properties, attributes):
+    """
+    Returns the Python code of the functions projecting `properties`,
+    one for them and one for each object under them, and the list of the
+    properties of each function, by index.
+    """
+
+    if properties is None:
+        return IDENTITY, [None]
+
+    selections = [properties]
+    functions = []
+
+    for index, selection in enumerate(selections):
+        items = []
+        for prop in selection:
+            name = name_of(prop)
+            value = get_value(name, attributes)
+
+            nested = properties_of(prop)
+            if nested is not None:
+                value = '_project%d(%s)' % (len(selections), value)
+                selections.append(nested)
+
+            items.append('%r: %s' % (name, value))
+
+        item = '{' + ', '.join(items) + '}'
+        functions.append(FUNCTION % {'index': index, 'item': item})
+        if index == 0:
+            functions.append(MANY % {'item': item})
+
+    return ''.join(functions), selections
+
+
+def get_value(name, attributes):
+    """
+    Returns the code reading the property `name` of `row`.
+    """
+
+    if not attributes:
+        return 'row[%r]' % name
+
+    if IDENTIFIER_RE.match(name) and not keyword.iskeyword(name):
+        return 'row.' + name
+
+    return 'getattr(row, %r)' % name
+
+
+def walk(data, properties, attributes=False):
+    """
+    Keeps the given `properties` of the data of an object, skipping those
+    it doesn't have. Projectors fall back to it for such data.
+    """
+
+    if data is None or properties is None:
+        return data
+
+    if isinstance(data, list):
+        return [walk(item, properties, attributes) for item in data]
+
+    result = {}
+    for prop in properties:
+        name = name_of(prop)
+        if attributes:
+            if hasattr(data, name):
+                result[name] = walk(getattr(data, name), properties_of(prop), attributes)
+        elif name in data:
+            result[name] = walk(data[name], properties_of(prop), attributes)
+
+    return result
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of persisted queries.
+
+Known queries are registered ahead of time (e.g. at deploy time), and
+clients send only their hash. Resolving a hash returns the AST parsed at
+registration, so the hot path never parses anything.
+
+>>> registry = graphql.registry.Registry()
+>>> key = registry.register('{ user(id: 232) { id, name } }')
+>>> registry.save('queries.json')
+
+And on each worker:
+
+>>> registry = graphql.registry.Registry.load('queries.json')
+>>> registry.resolve(key)
+[{'name': 'user', 'params': {'id': 232}, 'properties': [...]}]
+"""
+from __future__ import unicode_literals
+import io
+import json
+import hashlib
+from .graphql import loads, dumps
+from .cache import copy_ast
+from .hashing import canonicalize
+
+__all__ = ['Registry', 'query_hash']
+
+# 2: keys are hashes of the canonical form, not of the compact one
+FORMAT_VERSION = 2
+
+
+def query_hash(canonical):
+    """
+    Hashes the canonical form of a query, as given by
+    `graphql.hashing.canonicalize(ast)`. Neither whitespace nor the order
+    of params in the original text change it.
+    """
+
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class Registry(object):
+    """
+    Maps query hashes to their parsed AST and compact form. The hash is
+    that of the canonical form, with params sorted, so it only depends on
+    what the query asks for.
+    """
+
+    def __init__(self, engine='pyparsing'):
+        self.engine = engine
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def register(self, query):
+        """
+        Parses `query` and stores it. Returns its hash.
+        """
+
+        ast = loads(query, engine=self.engine)
+        compact = dumps(ast, compact=True)
+        key = query_hash(canonicalize(ast))
+
+        self._entries[key] = (ast, compact)
+        return key
+
+    def resolve(self, key, copy=True):
+        """
+        Returns the AST registered under `key`. Raises `KeyError` for
+        unknown hashes.
+
+        With `copy=False` the stored AST itself is returned, which is faster
+        but must not be mutated.
+        """
+
+        ast, _ = self._entries[key]
+        return copy_ast(ast) if copy else ast
+
+    def compact(self, key):
+        """
+        Returns the compact GraphQL text registered under `key`.
+        """
+
+        _, compact = self._entries[key]
+        return compact
+
+    def save(self, path):
+        """
+        Writes every registered query to a single JSON file.
+        """
+
+        data = {
+            'version': FORMAT_VERSION,
+            'queries': dict((key, {'query': compact, 'ast': ast})
+                            for key, (ast, compact) in self._entries.items())
+        }
+
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False, sort_keys=True))
+
+    def update(self, path):
+        """
+        Adds every query in a file written by `save`, without parsing them.
+        """
+
+        with io.open(path, encoding='utf-8') as f:
+            data = json.loads(f.read())
+
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError('Unsupported registry file version %r' % data.get('version'))
+
+        for key, entry in data['queries'].items():
+            self._entries[key] = (restore_ast(entry['ast']), entry['query'])
+
+    @classmethod
+    def load(cls, path, engine='pyparsing'):
+        """
+        Creates a registry from a file written by `save`.
+        """
+
+        registry = cls(engine)
+        registry.update(path)
+        return registry
+
+
+def restore_ast(ast):
+    """
+    JSON has no tuples, so filters come back from a file as lists of lists.
+    """
+
+    for obj in ast:
+        if 'filters' in obj:
+            obj['filters'] = [tuple(filter_) for filter_ in obj['filters']]
+        if 'properties' in obj:
+            restore_ast(obj['properties'])
+
+    return ast
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+Lazy, zero-copy parsing.
+
+Nodes here only hold offsets into the buffer the query was parsed from: a
+``str``, ``bytes``, ``bytearray``, ``memoryview`` or ``mmap``. On Python
+2, whose regexes can't read a ``memoryview``, it's copied first. Names,
+params and filters are read from the buffer when they are first used,
+and the properties of an object are only scanned then, so going through
+the top-level objects of a large query allocates almost nothing:
+
+>>> with open('dump.graphql', 'rb') as f:
+...     buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+>>> [obj.name for obj in graphql.spans.iterparse(buffer)]
+['user', 'company']
+
+Nodes read the same as those of `graphql.nodes`, so `graphql.dumps` and
+`graphql.nodes.to_dicts` accept them. Nodes are only checked as far as
+they are used: a syntax error in the params of an object is raised when
+they are read.
+"""
+from __future__ import unicode_literals
+import re
+import six
+from . import parser
+from .nodes import UNSET
+from .parser import ParseError
+
+__all__ = ['parse', 'iterparse', 'Object', 'Field']
+
+NAME_PATTERN = r'[a-zA-Z_][a-zA-Z0-9_/]*'
+SPACE_PATTERN = r'[ \t\r\n]*'
+
+# The punctuation after some whitespace, by group: `{`, `}`, `,`, and
+# `(` or `.` which start the header of an object.
+OPEN, CLOSE, COMMA, HEADER = range(1, 5)
+PUNCTUATION_PATTERN = r'[ \t\r\n]*(?:(\{)|(\})|(,)|([(.]))?'
+
+# Braces by group, `{` then `}`. Strings, which may contain braces, match
+# without a group, and a lone quote (an unterminated string) is group 3.
+BRACES_PATTERN = r'''
+      (\{)|(\})
+    | "(?:[^"\n\r\\]|(?:"")|(?:\\x[0-9a-fA-F]+)|(?:\\.))*"
+    | '(?:[^'\n\r\\]|(?:'')|(?:\\x[0-9a-fA-F]+)|(?:\\.))*'
+    | (["'])
+'''
+
+
+class Scanner(object):
+    """
+    The regexes for one kind of buffer, text or bytes.
+    """
+
+    def __init__(self, text):
+        encode = (lambda pattern: pattern) if text else (lambda pattern: pattern.encode('ascii'))
+
+        self.text = text
+        self.name = re.compile(encode(NAME_PATTERN))
+        self.space = re.compile(encode(SPACE_PATTERN))
+        self.punctuation = re.compile(encode(PUNCTUATION_PATTERN))
+        self.braces = re.compile(encode(BRACES_PATTERN), re.VERBOSE)
+
+
+TEXT_SCANNER = Scanner(text=True)
+BYTES_SCANNER = Scanner(text=False)
+
+
+class Source(object):
+    """
+    A buffer, the scanner for it, and where its query ends.
+    """
+
+    __slots__ = ('buffer', 'scanner', 'endpos')
+
+    def __init__(self, buffer, endpos):
+        self.buffer = buffer
+        self.scanner = TEXT_SCANNER if isinstance(buffer, six.text_type) else BYTES_SCANNER
+        self.endpos = endpos
+
+    def text(self, start, end):
+        """
+        Returns the text between two offsets.
+        """
+
+        chunk = self.buffer[start:end]
+        if self.scanner.text:
+            return chunk
+
+        return bytes(chunk).decode('utf-8')
+
+    def error(self, msg, loc):
+        head = self.buffer[:loc]
+        if not self.scanner.text:
+            head = bytes(head).decode('utf-8', 'replace')
+
+        lineno = head.count('\n') + 1
+        col = len(head) - (head.rfind('\n') + 1) + 1
+        return ParseError(msg, '', 0, start=(loc, lineno, col))
+
+
+def parse(buffer, pos=0, endpos=None):
+    """
+    Parses the query in `buffer`, between the offsets `pos` and `endpos`
+    (its whole length by default), into a list of `Object`.
+    """
+
+    return list(iterparse(buffer, pos, endpos))
+
+
+def iterparse(buffer, pos=0, endpos=None):
+    """
+    Like `parse`, but yields the top-level objects as they are found. The
+    rest of the query is only checked as they are needed.
+    """
+
+    if six.PY2 and isinstance(buffer, memoryview):
+        buffer = buffer.tobytes()
+
+    if endpos is None:
+        endpos = len(buffer)
+
+    source = Source(buffer, endpos)
+    scanner = source.scanner
+
+    match = scanner.punctuation.match(buffer, pos, endpos)
+    if match.lastindex != OPEN:
+        raise source.error("Expected '{'", match.end())
+
+    pos = match.end()
+    while True:
+        pos = scanner.space.match(buffer, pos, endpos).end()
+        name = scanner.name.match(buffer, pos, endpos)
+        if name is None:
+            raise source.error('Expected identifier', pos)
+
+        obj = scan_object(source, pos, name.end())
+        yield obj
+
+        match = scanner.punctuation.match(buffer, obj.end, endpos)
+        pos = match.end()
+        if match.lastindex == COMMA:
+            continue
+        if match.lastindex == CLOSE:
+            break
+        raise source.error("Expected ',' or '}'", pos)
+
+    pos = scanner.space.match(buffer, pos, endpos).end()
+    if pos != endpos:
+        raise source.error('Expected end of text', pos)
+
+
+def scan_object(source, start, name_end):
+    """
+    Finds the opening brace and the end of the object whose name is
+    between `start` and `name_end`, skipping over strings, which may
+    contain braces.
+    """
+
+    body = None
+    depth = 0
+
+    for match in source.scanner.braces.finditer(source.buffer, name_end, source.endpos):
+        group = match.lastindex
+        if group == OPEN:
+            if body is None:
+                body = match.start()
+            depth += 1
+        elif group == CLOSE:
+            if body is None:
+                break
+            depth -= 1
+            if depth == 0:
+                return Object(source, start, name_end, body, match.end())
+        elif group is not None:
+            raise source.error('Unterminated string', match.start())
+
+    if body is None:
+        raise source.error("Expected '{'", name_end)
+
+    raise source.error("Expected '}'", source.endpos)
+
+
+def scan_properties(source, body, end):
+    """
+    Scans the properties of an object whose braces are at `body` and
+    ``end - 1``.
+    """
+
+    buffer = source.buffer
+    scanner = source.scanner
+    properties = []
+
+    pos = body + 1
+    while True:
+        pos = scanner.space.match(buffer, pos, end).end()
+        name = scanner.name.match(buffer, pos, end)
+        if name is None:
+            raise source.error('Expected identifier', pos)
+
+        name_end = name.end()
+        if scanner.punctuation.match(buffer, name_end, end).lastindex in (OPEN, HEADER):
+            prop = scan_object(source, pos, name_end)
+        else:
+            prop = Field(source, pos, name_end)
+        properties.append(prop)
+
+        match = scanner.punctuation.match(buffer, prop.end, end)
+        pos = match.end()
+        if match.lastindex == COMMA:
+            continue
+        if match.lastindex == CLOSE and pos == end:
+            return properties
+        raise source.error("Expected ',' or '}'", pos)
+
+
+class Field(object):
+    """
+    A leaf field, spanning `start` to `end` in `source.buffer`.
+    """
+
+    __slots__ = ('source', 'start', 'end')
+
+    params = UNSET
+    filters = None
+    properties = None
+
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+
+    @property
+    def name(self):
+        return self.source.text(self.start, self.end)
+
+    def __repr__(self):
+        return 'Field(%r)' % self.name
+
+
+class Object(object):
+    """
+    An object, spanning `start` to `end` in `source.buffer`. Its name ends
+    at `name_end`, and its properties start with the brace at `body`.
+    """
+
+    __slots__ = ('source', 'start', 'name_end', 'body', 'end', '_header', '_properties')
+
+    def __init__(self, source, start, name_end, body, end):
+        self.source = source
+        self.start = start
+        self.name_end = name_end
+        self.body = body
+        self.end = end
+        self._header = None
+        self._properties = None
+
+    @property
+    def name(self):
+        return self.source.text(self.start, self.name_end)
+
+    @property
+    def params(self):
+        return self.header()[0]
+
+    @property
+    def filters(self):
+        return self.header()[1]
+
+    @property
+    def properties(self):
+        if self._properties is None:
+            self._properties = scan_properties(self.source, self.body, self.end)
+        return self._properties
+
+    @property
+    def text(self):
+        """
+        The whole object, as it's written in the query.
+        """
+
+        return self.source.text(self.start, self.end)
+
+    def header(self):
+        """
+        Returns the params and filters of the object, parsed on first use.
+        """
+
+        if self._header is not None:
+            return self._header
+
+        source = self.source
+        if source.scanner.space.match(source.buffer, self.name_end).end() == self.body:
+            self._header = (UNSET, None)
+            return self._header
+
+        text = source.text(self.start, self.body + 1)
+        tokens = parser.tokenize(text)
+        tokens.extend((parser.EOF, parser.EOF))
+        try:
+            obj, _, i = parser.parse_header(text, tokens, 0, nodes=True)
+            if tokens[i] is not parser.EOF:
+                raise parser.error(text, tokens, i, "Expected '{'")
+        except ParseError as e:
+            loc = e.loc if source.scanner.text else len(text[:e.loc].encode('utf-8'))
+            raise source.error(e.msg, self.start + loc)
+
+        self._header = (obj.params, obj.filters)
+        return self._header
+
+    def __repr__(self):
+        return 'Object(%r, start=%d, end=%d)' % (self.name, self.start, self.end)
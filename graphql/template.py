@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Parameterized query templates.
+
+Queries that differ only in their literal values (``user(id: 232)`` and
+``user(id: 233)``) share the same *shape*. `compile` lifts the literals out
+of a query into a list of values and parses the remaining skeleton only the
+first time that shape is seen. Binding values to the skeleton is much
+cheaper than parsing.
+
+>>> template = graphql.compile('{ user(id: 232) { id, name } }')
+>>> template.values
+[232]
+>>> template.bind([233])
+[{'name': 'user', 'params': {'id': 233}, 'properties': [...]}]
+"""
+from __future__ import unicode_literals
+from . import parser
+from .hashing import fingerprint
+from .cache import QueryCache
+
+__all__ = ['compile', 'Template']
+
+# Skeletons are never mutated, so they don't need to be copied.
+SKELETONS = QueryCache(max_entries=1024, copy=False)
+
+
+def compile(query, cache=SKELETONS):
+    """
+    Splits `query` into a `Template` and its literal values. Skeletons
+    are kept in `cache`, a `graphql.QueryCache` created with ``copy=False``.
+    """
+
+    # Lost once the tokens are joined
+    parser.check_start(query)
+
+    tokens = parser.tokenize(query)
+    values = []
+
+    # A literal is either right after a `:` or alone inside parens. In the
+    # skeleton, each literal is replaced by its index in `values`.
+    prev = None
+    for i, tok in enumerate(tokens):
+        if ((prev == ':' or prev == '(' and tokens[i + 1:i + 2] != [':']) and
+                parser.is_literal(tok)):
+            tokens[i] = str(len(values))
+            values.append(tok)
+        prev = tok
+
+    text = ' '.join(tokens)
+    skeleton = cache.get(text)
+    if skeleton is None:
+        try:
+            skeleton = Skeleton(text, len(values))
+        except ValueError:
+            # Report the error against the original query instead
+            parser.parse(query)
+            raise
+
+        cache.put(text, skeleton)
+
+    return Template(skeleton, [parser.decode(tok) for tok in values])
+
+
+class Skeleton(object):
+    """
+    The parsed shape of a query. Every literal in `ast` is the index of
+    the value that goes in its place.
+    """
+
+    __slots__ = ('ast', 'slots', 'fingerprint')
+
+    def __init__(self, text, slots):
+        self.ast = parser.parse(text)
+        self.slots = slots
+        self.fingerprint = fingerprint(self.ast, literals=False)
+
+
+class Template(object):
+    """
+    A query shape, plus the literal values it was compiled with.
+    """
+
+    __slots__ = ('skeleton', 'values')
+
+    def __init__(self, skeleton, values):
+        self.skeleton = skeleton
+        self.values = values
+
+    @property
+    def fingerprint(self):
+        """
+        Identifies the shape of the query, regardless of its literal values.
+        Same as ``graphql.fingerprint(query, literals=False)``.
+        """
+
+        return self.skeleton.fingerprint
+
+    def bind(self, values=None):
+        """
+        Builds the AST for the given literal values, in the order they
+        appear in the query. Defaults to the values of the compiled query.
+        """
+
+        if values is None:
+            values = self.values
+        elif len(values) != self.skeleton.slots:
+            raise ValueError('Expected %d values, got %d' % (self.skeleton.slots, len(values)))
+
+        return [bind_object(obj, values) for obj in self.skeleton.ast]
+
+
+def bind_object(obj, values):
+    bound = {'name': obj['name']}
+
+    if 'params' in obj:
+        bound['params'] = bind_params(obj['params'], values)
+
+    if 'filters' in obj:
+        bound['filters'] = [(name, bind_params(params, values))
+                            for name, params in obj['filters']]
+
+    if 'properties' in obj:
+        bound['properties'] = [bind_object(prop, values) if 'properties' in prop
+                               else {'name': prop['name']}
+                               for prop in obj['properties']]
+
+    return bound
+
+
+def bind_params(params, values):
+    if isinstance(params, dict):
+        return dict((key, values[slot]) for key, slot in params.items())
+
+    return values[params]
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import pytest
+import graphql
+from graphql.analysis import cost, check, Cost, LimitExceeded
+
+QUERY = """
+{
+    user(id: 232) {
+        id,
+        friends.first(10) {
+            id,
+            photos.first(5) { url }
+        }
+    },
+    company(null) { name }
+}"""
+
+
+def test_cost():
+    ast = graphql.loads(QUERY)
+
+    assert cost(ast) == Cost(depth=4, fields=8, fanout=50, cost=1 + 1 + 1 + 10 + 10 + 50 + 1 + 1)
+    assert cost(graphql.loads(QUERY, nodes=True)) == cost(ast)
+    assert cost(ast, weights={'photos': 3, 'url': 0}).cost == 1 + 1 + 1 + 10 + 30 + 1 + 1
+
+
+def test_cost_limits():
+    ast = graphql.loads(QUERY)
+
+    for limit, maximum in [('depth', 3), ('fields', 7), ('fanout', 49), ('cost', 74)]:
+        with pytest.raises(LimitExceeded) as raised:
+            cost(ast, limits={limit: maximum})
+        assert raised.value.limit == limit
+        assert raised.value.maximum == maximum
+
+    assert cost(ast, limits={'depth': 4, 'fields': 8, 'fanout': 50, 'cost': 75}) == cost(ast)
+
+    with pytest.raises(ValueError):
+        cost(ast, limits={'height': 1})
+
+
+def test_check():
+    check(QUERY, {'depth': 4, 'fields': 8})
+
+    with pytest.raises(LimitExceeded):
+        check(QUERY, {'depth': 3})
+    with pytest.raises(LimitExceeded):
+        check(QUERY, {'fields': 7})
+    with pytest.raises(ValueError):
+        check(QUERY, {'cost': 10})
+
+
+def test_loads_limits():
+    deep = '{' + 'a { ' * 100000 + 'b' + ' }' * 100001
+
+    for engine in graphql.graphql.ENGINES:
+        with pytest.raises(LimitExceeded):
+            graphql.loads(deep, engine=engine, limits={'depth': 10})
+
+        assert graphql.loads(QUERY, engine=engine, limits={'depth': 4}) == graphql.loads(QUERY)
+
+
+def test_pyparsing_max_depth():
+    too_deep = graphql.graphql.PYPARSING_MAX_DEPTH
+    query = '{' + 'a { ' * too_deep + 'b' + ' }' * (too_deep + 1)
+
+    with pytest.raises(LimitExceeded) as raised:
+        graphql.loads(query)
+    assert raised.value.limit == 'depth'
+
+    # One level less is fine, and goes through load_obj
+    query = '{' + 'a { ' * (too_deep - 1) + 'b' + ' }' * too_deep
+    assert graphql.loads(query) == graphql.loads(query, engine='fast')
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import pickle
+import pytest
+import graphql
+from graphql import binary
+from graphql.nodes import Field, Object
+
+QUERIES = [
+    '{ user(id: 232) { id, name, photo(size: 50) { url } } }',
+    '{ a { b }, c(1).d().e(x: 2, y: "s") { f }, g() { h(1) { i } } }',
+    '{ user(id: -232, ratio: -1.5, big: 12345678901234567890, none: null, yes: true, no: false) { id } }',
+    '{ user(name: "Zoë \\u2603", empty: "") { photo(size: 50).first(10) { url }, id, a/b } }',
+    '{ ' + 'deep { ' * 50 + 'id' + ' }' * 50 + ' }',
+    '{ wide { ' + ', '.join('f%d' % i for i in range(1000)) + ' } }',
+]
+
+
+def test_round_trip():
+    for query in QUERIES:
+        ast = graphql.loads(query, engine='fast')
+        data = binary.encode(ast)
+
+        assert binary.decode(data) == ast
+        assert graphql.dumps(binary.decode(data)) == graphql.dumps(ast)
+
+
+def test_nodes():
+    for query in QUERIES:
+        ast = graphql.loads(query, engine='fast')
+        nodes = graphql.loads(query, engine='fast', nodes=True)
+
+        assert binary.encode(nodes) == binary.encode(ast)
+        assert binary.decode(binary.encode(ast), nodes=True) == nodes
+
+    decoded = binary.decode(binary.encode(graphql.loads(QUERIES[0])), nodes=True)
+    assert type(decoded[0]) is Object
+    assert type(decoded[0].properties[0]) is Field
+
+
+def test_buffers():
+    data = binary.encode(graphql.loads(QUERIES[0]))
+    expected = binary.decode(data)
+
+    assert binary.decode(memoryview(data)) == expected
+    assert binary.decode(bytearray(data)) == expected
+    assert binary.decode(memoryview(b'xx' + data + b'xx')[2:-2]) == expected
+
+
+def test_sizes():
+    for query in QUERIES:
+        ast = graphql.loads(query, engine='fast')
+        assert len(binary.encode(ast)) < len(pickle.dumps(ast, pickle.HIGHEST_PROTOCOL))
+
+    ast = [{'name': 'a', 'params': {'x': 'y' * 70000}, 'properties': [{'name': 'b'}]}]
+    assert binary.decode(binary.encode(ast)) == ast
+
+
+def test_dicts():
+    ast = [
+        {'name': 'a', 'params': {}, 'filters': [], 'properties': []},
+        {'name': 'b', 'params': 1, 'properties': [{'name': 'c', 'params': 'x'}, {'name': 'd'}]},
+    ]
+    assert binary.decode(binary.encode(ast)) == ast
+    assert binary.decode(binary.encode([])) == []
+
+
+def test_invalid():
+    data = binary.encode(graphql.loads(QUERIES[0]))
+
+    for invalid in [b'', b'GQL', b'GQB\x02' + data[4:], data[:-1], data + b'\x00', data[:5]]:
+        with pytest.raises(ValueError):
+            binary.decode(invalid)
+
+    with pytest.raises(TypeError):
+        binary.encode([{'name': 'a', 'params': [1, 2], 'properties': [{'name': 'b'}]}])
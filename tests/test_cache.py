@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import threading
+import graphql
+
+
+QUERY = '{ photos(size: 50).after(id: 232) { url, owner { id, name } } }'
+
+
+def test_hits_and_misses():
+    cache = graphql.QueryCache()
+
+    first = graphql.loads(QUERY, cache=cache)
+    second = graphql.loads(QUERY, cache=cache, engine='fast')
+
+    assert first == second == graphql.loads(QUERY)
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 0)
+    assert len(cache) == 1
+    assert QUERY in cache
+
+
+def test_mutating_results_does_not_poison_the_cache():
+    cache = graphql.QueryCache()
+    expected = graphql.loads(QUERY)
+
+    data = graphql.loads(QUERY, cache=cache)
+    data[0]['params']['size'] = 100
+    data[0]['filters'][0][1]['id'] = 1
+    data[0]['properties'][1]['properties'].pop()
+    data.append({'name': 'foo'})
+
+    assert graphql.loads(QUERY, cache=cache) == expected
+
+
+def test_eviction_by_entries():
+    cache = graphql.QueryCache(max_entries=2)
+
+    a, b, c = ['{ %s { id } }' % name for name in 'abc']
+    graphql.loads(a, cache=cache)
+    graphql.loads(b, cache=cache)
+    graphql.loads(a, cache=cache)  # b is now the least recently used
+    graphql.loads(c, cache=cache)
+
+    assert a in cache and c in cache
+    assert b not in cache
+    assert cache.evictions == 1
+
+
+def test_eviction_by_bytes():
+    a, b = '{ a { id } }', '{ b { id } }'
+    cache = graphql.QueryCache(max_bytes=len(a) + len(b) - 1)
+
+    graphql.loads(a, cache=cache)
+    graphql.loads(b, cache=cache)
+
+    assert list(cache._entries) == [b]
+    assert cache.size == len(b)
+    assert cache.evictions == 1
+
+    # Queries larger than the whole cache are never stored
+    graphql.loads('{ %s { id } }' % ('x' * 100), cache=cache)
+    assert list(cache._entries) == [b]
+
+
+def test_clear():
+    cache = graphql.QueryCache()
+    graphql.loads(QUERY, cache=cache)
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_threads():
+    cache = graphql.QueryCache(max_entries=4)
+    queries = ['{ user(%d) { id } }' % i for i in range(8)]
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(50):
+                for i, query in enumerate(queries):
+                    assert graphql.loads(query, cache=cache, engine='fast')[0]['params'] == i
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(cache) == 4
+    assert cache.hits + cache.misses == 8 * 50 * 8
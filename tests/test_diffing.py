@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import graphql
+from graphql.diffing import Change, IncrementalEncoder
+from graphql.nodes import UNSET, Field
+
+BASE = '{ user(id: 232) { id, photos.first(10) { url, size }, friends { name } }, company { name } }'
+
+
+def test_diff():
+    old = graphql.loads(BASE)
+    new = graphql.loads('{ company { name, address }, user(id: 233) { id, photos.first(20) { url } } }')
+
+    assert graphql.diff(old, old) == []
+    assert graphql.diff(old, new) == [
+        Change('params', ('user',), {'id': 232}, {'id': 233}),
+        Change('added', ('company',), UNSET, {'name': 'address'}),
+        Change('filters', ('user', 'photos'), [('first', 10)], [('first', 20)]),
+        Change('removed', ('user',), {'name': 'friends', 'properties': [{'name': 'name'}]}, UNSET),
+        Change('removed', ('user', 'photos'), {'name': 'size'}, UNSET),
+    ]
+
+
+def test_diff_nodes():
+    old = graphql.loads('{ a { b, c } }', nodes=True)
+    new = graphql.loads('{ a { c, d } }', nodes=True)
+
+    assert graphql.diff(old, new) == [
+        Change('added', ('a',), UNSET, Field('d')),
+        Change('removed', ('a',), Field('b'), UNSET),
+    ]
+
+
+def test_diff_types():
+    old = graphql.loads('{ user(id: 1) { photos.first(1) { url } } }')
+    new = graphql.loads('{ user(id: true) { photos.first(1.0) { url } } }')
+
+    assert graphql.diff(old, new) == [
+        Change('params', ('user',), {'id': 1}, {'id': True}),
+        Change('filters', ('user', 'photos'), [('first', 1)], [('first', 1.0)]),
+    ]
+
+
+def test_incremental_encoder():
+    ast = graphql.loads(BASE)
+
+    for options in [{}, {'compact': True}]:
+        encoder = IncrementalEncoder(**options)
+        assert encoder.encode(ast) == graphql.dumps(ast, **options)
+
+        # Changes in place are seen too
+        ast[0]['properties'][1]['filters'] = [('first', 20)]
+        ast[0]['properties'][2]['properties'].append({'name': 'id'})
+        assert encoder.encode(ast) == graphql.dumps(ast, **options)
+
+        nodes = graphql.nodes.from_dicts(ast)
+        assert encoder.encode(nodes) == graphql.dumps(ast, **options)
+        nodes[1].properties.append(Field('address'))
+        assert encoder.encode(nodes) == graphql.dumps(nodes, **options)
+
+
+def test_incremental_encoder_reuses_text():
+    encoder = IncrementalEncoder()
+    encoder.encode(graphql.loads(BASE))
+    fragment = encoder._fragments['user(id:232){'].children['photos.first(10){']
+
+    encoder.encode(graphql.loads(BASE.replace('friends { name }', 'friends { name, id }')))
+    assert encoder._fragments['user(id:232){'].children['photos.first(10){'] is fragment
+
+
+def test_incremental_encoder_deep():
+    depth = 100
+    ast = [{'name': 'b'}]
+    for _ in range(depth):
+        ast = [{'name': 'a', 'properties': ast}]
+
+    encoder = IncrementalEncoder(compact=True)
+    assert encoder.encode(ast) == encoder.encode(ast) == graphql.dumps(ast, compact=True)
+
+
+def test_incremental_encoder_types():
+    for nodes in [False, True]:
+        encoder = IncrementalEncoder(compact=True)
+        for query in ['{ user { photo(size: 1).first(2) { url } } }',
+                      '{ user { photo(size: true).first(2) { url } } }',
+                      '{ user { photo(size: true).first(2.0) { url } } }']:
+            ast = graphql.loads(query, nodes=nodes)
+            assert encoder.encode(ast) == graphql.dumps(ast, compact=True)
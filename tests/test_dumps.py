@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 from textwrap import dedent
+import io
+import subprocess
+import sys
 import graphql
 
 
@@ -167,3 +170,62 @@ def test_dumps_compact():
 
     assert query == ('{user(id:232){id,name},'
                       'photo(size:50){url,width,height}}')
+
+
+def test_dumps_loaded_filters_and_multiple_args():
+    ast = graphql.loads('{ photos(size: 50, crop: true).after(id: 232).first(10) { url } }')
+
+    # Params are in a dict, so in no particular order before Python 3.7
+    assert graphql.dumps(ast, compact=True) in [
+        '{photos(size:50,crop:true).after(id:232).first(10){url}}',
+        '{photos(crop:true,size:50).after(id:232).first(10){url}}',
+    ]
+    assert graphql.loads(graphql.dumps(ast)) == ast
+
+
+def test_dump_and_iterdumps():
+    ast = graphql.loads("""
+    {
+        user(id: 232).first(2) {
+            id,
+            photo(size: 50) {
+                url,
+                owner { id }
+            },
+            name
+        },
+        company(null) {
+            address
+        }
+    }""")
+
+    for options in [{}, {'indent': 4}, {'compact': True}]:
+        expected = graphql.dumps(ast, **options)
+        assert ''.join(graphql.iterdumps(ast, **options)) == expected
+
+        fp = io.StringIO()
+        graphql.dump(ast, fp, **options)
+        assert fp.getvalue() == expected
+
+
+def test_dumps_deeply_nested():
+    depth = 5000
+    ast = [{'name': 'b'}]
+    for _ in range(depth):
+        ast = [{'name': 'a', 'properties': ast}]
+
+    assert graphql.dumps(ast, compact=True) == '{' + 'a{' * depth + 'b' + '}' * (depth + 1)
+
+
+def test_dumps_doesnt_import_pyparsing():
+    # Run in a new interpreter, the tests have imported pyparsing already
+    script = (
+        'import sys, graphql\n'
+        'graphql.dumps([{"name": "user", "properties": [{"name": "id"}]}])\n'
+        'graphql.loads("{ user { id } }", engine="fast")\n'
+        'assert "pyparsing" not in sys.modules\n'
+        'assert "graphql.grammar" not in sys.modules\n'
+        'assert graphql.grammar.root is not None\n'
+        'assert "pyparsing" in sys.modules\n'
+    )
+    subprocess.check_call([sys.executable, '-c', script])
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import graphql
+from graphql import nodes
+
+QUERY = """
+{
+    user(id: 232).first(2) {
+        id,
+        photo(size: 50, crop: true) {
+            url,
+            owner { id }
+        }
+    },
+    company(null) {
+        address
+    }
+}"""
+
+
+def test_same_as_dumps():
+    ast = graphql.loads(QUERY)
+
+    for options in [{}, {'indent': 4}, {'compact': True}, {'indent': 0}]:
+        encoder = graphql.Encoder(**options)
+        assert encoder.encode(ast) == graphql.dumps(ast, **options)
+        assert encoder.encode(nodes.from_dicts(ast)) == graphql.dumps(ast, **options)
+        assert ''.join(encoder.iterencode(ast)) == graphql.dumps(ast, **options)
+
+
+def test_reuse():
+    encoder = graphql.Encoder(compact=True)
+    first = encoder.encode(graphql.loads(QUERY))
+    assert encoder.encode([{'name': 'a', 'params': 'x', 'properties': [{'name': 'b'}]}]) == '{a("x"){b}}'
+    assert encoder.encode(graphql.loads(QUERY)) == first
+
+
+def test_encode_value():
+    encoder = graphql.Encoder()
+
+    assert encoder.encode_value(None) == 'null'
+    assert encoder.encode_value(True) == 'true'
+    assert encoder.encode_value(False) == 'false'
+    assert encoder.encode_value(232) == '232'
+    assert encoder.encode_value(-2.5) == '-2.5'
+    assert encoder.encode_value(1e100) == '1e+100'
+    assert encoder.encode_value(float('inf')) == 'Infinity'
+    assert encoder.encode_value('foo') == '"foo"'
+    assert encoder.encode_value('say "hi"\n') == '"say \\"hi\\"\\n"'
+    assert encoder.encode_value('caf\xe9') == '"caf\\u00e9"'
+
+
+def test_deep_indentation():
+    depth = 50
+    ast = [{'name': 'b'}]
+    for _ in range(depth):
+        ast = [{'name': 'a', 'properties': ast}]
+
+    assert graphql.loads(graphql.Encoder(indent=1).encode(ast), engine='fast') == ast
+
+
+def test_chunks_of_a_wide_object():
+    ast = [{'name': 'user', 'properties': [{'name': 'field%d' % i} for i in range(20000)]}]
+    chunks = list(graphql.iterdumps(ast))
+
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) < 100000
+    assert ''.join(chunks) == graphql.dumps(ast)
+
+
+def test_string_cache():
+    encoder = graphql.Encoder()
+    short, large = 'a' * 10, 'b' * 10000
+
+    assert encoder.encode_value(short) == encoder.encode_value(short) == '"%s"' % short
+    assert encoder.encode_value(large) == '"%s"' % large
+    assert list(encoder._strings) == [short]
+
+    assert graphql.Encoder(cache_strings=False).encode_value(short) == '"%s"' % short
+    graphql.dumps([{'name': 'a', 'params': short, 'properties': [{'name': 'b'}]}])
+    assert all(encoder._strings is None for encoder in graphql.graphql.ENCODERS.values())
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import asyncio
+import pytest
+import graphql
+from graphql.execute import Executor
+
+USERS = {
+    232: {'id': 232, 'name': 'Mary', 'email': 'mary@example.com', 'friends': [233, 234]},
+    233: {'id': 233, 'name': 'John', 'email': 'john@example.com', 'friends': [232]},
+    234: {'id': 234, 'name': 'Anne', 'email': 'anne@example.com', 'friends': []},
+}
+
+PHOTOS = {
+    232: [{'url': 'a.jpg', 'width': 50}],
+    233: [{'url': 'b.jpg', 'width': 50}, {'url': 'c.jpg', 'width': 100}],
+    234: [],
+}
+
+
+def header(obj):
+    if isinstance(obj, dict):
+        return obj.get('params'), obj.get('filters')
+    return obj.params, obj.filters
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def make_executor(calls):
+    executor = Executor()
+
+    @executor.resolver('user')
+    async def user(parents, obj):
+        calls.append(('user', len(parents)))
+        return [USERS.get(header(obj)[0]['id'])]
+
+    @executor.resolver('friends')
+    async def friends(parents, obj):
+        calls.append(('friends', len(parents)))
+        await asyncio.sleep(0)
+        return [[USERS[i] for i in parent['friends']] for parent in parents]
+
+    @executor.resolver('photos')
+    def photos(parents, obj):
+        calls.append(('photos', len(parents)))
+        filters = header(obj)[1]
+        size = filters[0][1] if filters else None
+        return [PHOTOS[parent['id']][:size] for parent in parents]
+
+    return executor
+
+
+def test_execute():
+    calls = []
+    executor = make_executor(calls)
+    ast = graphql.loads('{ user(id: 232) { name, friends { id, photos { url } } } }')
+
+    assert run(executor.execute(ast)) == [{
+        'name': 'Mary',
+        'friends': [
+            {'id': 233, 'photos': [{'url': 'b.jpg'}, {'url': 'c.jpg'}]},
+            {'id': 234, 'photos': []},
+        ],
+    }]
+    # One call per level, for all the parents
+    assert calls == [('user', 1), ('friends', 1), ('photos', 2)]
+
+
+def test_execute_batches():
+    calls = []
+    executor = make_executor(calls)
+    ast = graphql.loads('{ user(id: 232) { friends { friends { name }, photos.first(1) { url } } } }')
+
+    assert run(executor.execute(ast)) == [{
+        'friends': [
+            {'friends': [{'name': 'Mary'}], 'photos': [{'url': 'b.jpg'}]},
+            {'friends': [], 'photos': []},
+        ],
+    }]
+    # The batches of a level run concurrently, in no particular order
+    assert calls[:2] == [('user', 1), ('friends', 1)]
+    assert sorted(calls[2:]) == [('friends', 2), ('photos', 2)]
+
+
+def test_execute_dedupe():
+    calls = []
+    executor = make_executor(calls)
+    ast = graphql.loads('{ user(id: 232) { name }, user(id: 232) { email }, user(id: 233) { name } }')
+
+    assert run(executor.execute(ast)) == [
+        {'name': 'Mary'}, {'email': 'mary@example.com'}, {'name': 'John'}]
+    assert sorted(calls) == [('user', 1), ('user', 1)]
+
+
+def test_execute_filters():
+    calls = []
+    executor = make_executor(calls)
+    result = run(executor.execute([{
+        'name': 'user', 'params': {'id': 233},
+        'properties': [{'name': 'photos', 'filters': [('first', 1)], 'properties': [{'name': 'url'}]},
+                       {'name': 'friends', 'properties': [{'name': 'id'}]}],
+    }]))
+    assert result == [{'photos': [{'url': 'b.jpg'}], 'friends': [{'id': 232}]}]
+    assert sorted(calls) == [('friends', 1), ('photos', 1), ('user', 1)]
+
+
+def test_execute_missing():
+    executor = make_executor([])
+    ast = graphql.loads('{ user(id: 1) { name }, company { name } }')
+
+    assert run(executor.execute(ast)) == [None, None]
+
+
+def test_execute_nodes():
+    executor = make_executor([])
+    query = '{ user(id: 233) { name, photos { url, width } } }'
+
+    assert (run(executor.execute(graphql.loads(query, nodes=True))) ==
+            run(executor.execute(graphql.loads(query))))
+
+
+def test_execute_bad_resolver():
+    executor = Executor({'user': lambda parents, obj: []})
+
+    with pytest.raises(ValueError) as raised:
+        run(executor.execute(graphql.loads('{ user { id } }')))
+    assert 'returned 0 values for 1 parents' in str(raised.value)
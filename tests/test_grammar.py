@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from contextlib import contextmanager
+import pyparsing as pp
 from pyparsing import ParseException
 from graphql import grammar
 
@@ -177,3 +178,35 @@ def test_root():
             User {id, name},
             AnotherUser {id, name}
         }""")
+
+
+def test_build_is_independent():
+    other = grammar.build()
+
+    assert other.root is not grammar.root
+    assert other.string is not pp.quotedString
+    assert other.gql_header.parseString('user(232)').asList() == ['user', ['232'], []]
+
+
+def test_memoized_grammar():
+    query = """
+    {
+        user(id: 232, name: "Adalberto").first(2) {
+            id,
+            photo(50) { url, width }
+        },
+        company { name }
+    }"""
+
+    memoized = grammar.memoized()
+    assert memoized is grammar.memoized()
+    assert memoized.parse(query).asList() == grammar.root.parseString(query).asList()
+    assert memoized.memo.table is None
+
+    with assert_raises(ParseException):
+        memoized.parse('{ user { id } company { id } }')
+    assert memoized.memo.table is None
+
+    # pyparsing's own packrat mode is left alone
+    assert pp.ParserElement._parse == pp.ParserElement._parseNoCache
+    assert '_parse' not in vars(pp.quotedString)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import graphql
+from graphql import nodes
+from graphql.hashing import canonicalize
+
+QUERY = '{ user(id: 232, name: "foo").first(10) { id, photo(size: 50) { url } } }'
+
+
+def test_canonicalize():
+    assert canonicalize(QUERY) == '{user(id:232,name:"foo").first(10){id,photo(size:50){url}}}'
+    assert canonicalize(QUERY, literals=False) == '{user(id:?,name:?).first(?){id,photo(size:?){url}}}'
+
+
+def test_same_query():
+    same = """
+    {
+        user(name: "foo", id: 232).first(10) {
+            id,
+            photo(size: 50) { url }
+        }
+    }"""
+
+    expected = graphql.fingerprint(QUERY)
+    assert graphql.fingerprint(same) == expected
+    assert graphql.fingerprint(graphql.loads(same)) == expected
+    assert graphql.fingerprint(graphql.loads(same, nodes=True)) == expected
+    assert graphql.fingerprint(nodes.to_dicts(graphql.loads(same, nodes=True))) == expected
+
+
+def test_different_queries():
+    different = [
+        '{ user(id: 233, name: "foo").first(10) { id, photo(size: 50) { url } } }',
+        '{ user(id: 232, name: "foo").first(10) { photo(size: 50) { url }, id } }',
+        '{ user(id: 232, name: "foo").first(10) { id, photo(size: 50) { url, id } } }',
+        '{ user(id: 232, nick: "foo").first(10) { id, photo(size: 50) { url } } }',
+        '{ user(id: 232, name: "foo").last(10) { id, photo(size: 50) { url } } }',
+    ]
+
+    fingerprints = set(graphql.fingerprint(query) for query in [QUERY] + different)
+    assert len(fingerprints) == len(different) + 1
+
+
+def test_literals():
+    other_values = '{ user(id: 1, name: "bar").first(20) { id, photo(size: 1) { url } } }'
+
+    assert graphql.fingerprint(QUERY) != graphql.fingerprint(other_values)
+    assert (graphql.fingerprint(QUERY, literals=False) ==
+            graphql.fingerprint(other_values, literals=False) ==
+            graphql.compile(QUERY).fingerprint)
+
+
+def test_stable():
+    # Must not change between processes or Python versions
+    assert graphql.fingerprint(QUERY) == '153f4024f0861d2f6d6408f259cc5bde8773077a'
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import pytest
+import graphql
+from graphql import instrumentation
+from graphql.instrumentation import Stats, MetricsHook, hooked
+
+QUERY = '{ user(id: 232) { id, name, photo(size: 50) { url } } }'
+
+
+class Sink(object):
+    def __init__(self):
+        self.metrics = []
+
+    def increment(self, name, value, tags):
+        self.metrics.append(('increment', name, value, tags))
+
+    def histogram(self, name, value, tags):
+        self.metrics.append(('histogram', name, tags))
+
+
+def test_loads_event():
+    events = []
+    with hooked(events.append):
+        graphql.loads(QUERY)
+        graphql.loads(QUERY, engine='fast', limits={'depth': 5})
+
+    pyparsing, fast = events
+    assert (pyparsing.operation, pyparsing.engine, fast.engine) == ('loads', 'pyparsing', 'fast')
+    assert pyparsing.size == fast.size == len(QUERY)
+    assert pyparsing.tokens == fast.tokens == len(graphql.parser.tokenize(QUERY))
+    assert pyparsing.nodes == fast.nodes == 5
+    assert sorted(pyparsing.phases) == ['convert', 'parse']
+    assert sorted(fast.phases) == ['parse']
+    assert pyparsing.duration >= sum(pyparsing.phases.values())
+    assert pyparsing.cache is None and pyparsing.error is None
+
+    assert instrumentation.HOOKS == ()
+
+
+def test_loads_cache():
+    events = []
+    cache = graphql.QueryCache()
+    with hooked(events.append):
+        graphql.loads(QUERY, cache=cache, limits={'depth': 5})
+        graphql.loads(QUERY, cache=cache, limits={'depth': 5})
+
+    miss, hit = events
+    assert (miss.cache, hit.cache) == (False, True)
+    assert sorted(miss.phases) == ['check', 'convert', 'parse']
+    assert sorted(hit.phases) == ['check']
+    assert miss.nodes == hit.nodes == 5
+    assert hit.tokens is None
+
+
+def test_loads_error():
+    events = []
+    with hooked(events.append):
+        with pytest.raises(ValueError) as raised:
+            graphql.loads('{ user { id ', engine='fast')
+
+    assert events[0].error is raised.value
+
+
+def test_dumps_event():
+    ast = graphql.loads(QUERY)
+    events = []
+    with hooked(events.append):
+        text = graphql.dumps(ast)
+
+    event, = events
+    assert (event.operation, event.engine) == ('dumps', None)
+    assert event.size == len(text)
+    assert event.nodes == 5
+    assert list(event.phases) == ['encode']
+
+
+def test_stats():
+    stats = Stats()
+    cache = graphql.QueryCache()
+    with hooked(stats):
+        for _ in range(3):
+            graphql.dumps(graphql.loads(QUERY, cache=cache))
+
+    assert stats.calls == {'loads': 3, 'dumps': 3}
+    assert (stats.cache_hits, stats.cache_misses) == (2, 1)
+    assert stats.nodes == {'loads': 15, 'dumps': 15}
+    assert set(stats.time) == {('loads', 'parse'), ('loads', 'convert'), ('dumps', 'encode')}
+
+    stats.reset()
+    assert not stats.calls
+
+
+def test_metrics_hook():
+    sink = Sink()
+    with hooked(MetricsHook(sink, prefix='api')):
+        graphql.loads(QUERY, engine='fast', cache=graphql.QueryCache())
+
+    tags = {'engine': 'fast'}
+    assert sink.metrics == [
+        ('increment', 'api.loads.calls', 1, tags),
+        ('increment', 'api.loads.cache_misses', 1, tags),
+        ('histogram', 'api.loads.duration', tags),
+        ('histogram', 'api.loads.parse', tags),
+        ('histogram', 'api.loads.size', tags),
+        ('histogram', 'api.loads.tokens', tags),
+        ('histogram', 'api.loads.nodes', tags),
+    ]
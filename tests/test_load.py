@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import io
+import pytest
+import graphql
+from graphql.parser import ParseError
+
+
+QUERY = """
+{
+    user(name: "Louro {Jose}", nick: "a\\"b}") {
+        id,
+        photo(size: 50) {
+            url
+        }
+    },
+
+    company.first(2) {
+        address
+    }
+}
+"""
+
+
+def feed(query, size):
+    parser = graphql.IncrementalParser()
+    emitted = []
+
+    for i in range(0, len(query), size):
+        emitted.append(parser.feed(query[i:i + size]))
+
+    parser.close()
+    return emitted
+
+
+def test_load():
+    assert graphql.load(io.StringIO(QUERY)) == graphql.loads(QUERY)
+    assert graphql.load(io.StringIO('{ a { b } }'), nodes=True) == graphql.loads('{ a { b } }', nodes=True)
+    assert list(graphql.iterload(io.StringIO('{ a { b }, c { d } }'), chunk_size=3)) == [
+        {'name': 'a', 'properties': [{'name': 'b'}]},
+        {'name': 'c', 'properties': [{'name': 'd'}]},
+    ]
+
+
+def test_objects_are_emitted_as_soon_as_they_end():
+    query = '{ a { b }, c { d } }'
+    end_of_a = query.index('}') + 1
+
+    parser = graphql.IncrementalParser()
+    assert parser.feed(query[:end_of_a - 1]) == []
+    assert parser.feed(query[end_of_a - 1:end_of_a]) == [{'name': 'a', 'properties': [{'name': 'b'}]}]
+    assert parser.feed(query[end_of_a:]) == [{'name': 'c', 'properties': [{'name': 'd'}]}]
+    parser.close()
+
+
+def test_any_chunk_size():
+    expected = graphql.loads(QUERY, engine='fast')
+
+    for size in (1, 2, 7, 64, len(QUERY)):
+        assert sum(feed(QUERY, size), []) == expected
+
+
+def test_buffer_is_bounded():
+    parser = graphql.IncrementalParser()
+    parser.feed('{')
+    for i in range(1000):
+        parser.feed('user(%d) { id, name },\n' % i)
+        assert len(parser._buffer) < 30
+
+    parser.feed('last { id } }')
+    parser.close()
+
+
+def test_invalid_input():
+    invalid = [
+        '',
+        'x { a }',
+        '{ a { b }',
+        '{ a { b } c { d } }',
+        '{ a { b }, }',
+        '{ a { b } } x',
+        '{ a }',
+        '{ a { "b } }',
+        '{ a(x: 1 { b } }',
+        ' { a { b } }',
+        '\t \r{ a { b } }',
+    ]
+
+    for query in invalid:
+        for size in (1, len(query) or 1):
+            with pytest.raises(ParseError):
+                feed(query, size)
+
+
+def test_start_of_line():
+    for query in ('\n { a { b } }', ' \r\n{ a { b } }', ' \n\t{ a { b } }'):
+        for size in (1, 2, len(query)):
+            assert [o for chunk in feed(query, size) for o in chunk] == graphql.loads(query)
+
+    for size in (1, 3):
+        with pytest.raises(ParseError) as raised:
+            feed('   { a { b } }', size)
+        assert (raised.value.loc, raised.value.lineno, raised.value.col) == (0, 1, 1)
+
+
+def test_error_position():
+    query = '{\n  user {id, name},\n  company(x: 1 {id}\n}'
+
+    for size in (1, 5, len(query)):
+        try:
+            feed(query, size)
+        except ParseError as e:
+            assert (e.loc, e.lineno, e.col) == (36, 3, 16)
+        else:
+            assert False, 'ParseError not raised'
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+from pyparsing import ParseException
+import pytest
 import graphql
 
 
@@ -205,3 +207,34 @@ def test_nested_objects():
             ]
         }
     ]
+
+
+def test_memoize():
+    query = """
+    {
+        photos(username: "Louro Jose").after(id: 232, username: "Hebe") {
+            url,
+            owner(null) { id, name }
+        }
+    }"""
+
+    assert graphql.loads(query, memoize=True) == graphql.loads(query)
+
+
+def test_whole_input():
+    # Nothing but whitespace can follow the query, even on another line
+    assert graphql.loads('{ a { b } }\n\n') == [{'name': 'a', 'properties': [{'name': 'b'}]}]
+
+    for query in ['{ a { b } }\nfoo', '{ a { b } }\n\n{ c { d } }', '{ a { b } } foo']:
+        with pytest.raises(ParseException):
+            graphql.loads(query)
+
+
+def test_start_of_line():
+    # The opening brace starts a line: whitespace before it needs a line break
+    for query in ['\n{ a { b } }', '  \n{ a { b } }', '\n  { a { b } }', '\r\n{ a { b } }']:
+        assert graphql.loads(query) == [{'name': 'a', 'properties': [{'name': 'b'}]}]
+
+    for query in [' { a { b } }', '\t{ a { b } }', '\r{ a { b } }']:
+        with pytest.raises(ParseException):
+            graphql.loads(query)
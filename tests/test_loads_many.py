@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from pyparsing import ParseException
+import pytest
+import graphql
+from graphql.parser import ParseError
+
+
+def test_loads_many():
+    queries = ['{ user(%d) { id } }' % (i % 3) for i in range(9)]
+
+    assert graphql.loads_many(queries) == [graphql.loads(q) for q in queries]
+    assert graphql.loads_many(queries, engine='fast') == [graphql.loads(q) for q in queries]
+    assert graphql.loads_many(iter(queries), nodes=True) == [graphql.loads(q, nodes=True) for q in queries]
+
+
+def test_errors_are_returned_in_place():
+    results = graphql.loads_many(['{ a { b } }', '{ a }', '{ c { d } }', '{ a }'])
+
+    assert results[0] == graphql.loads('{ a { b } }')
+    assert isinstance(results[1], ParseException)
+    assert results[2] == graphql.loads('{ c { d } }')
+    assert results[3] is results[1]
+
+    results = graphql.loads_many(['{ a }', '{ a { b } }'], engine='fast')
+    assert isinstance(results[0], ParseError)
+
+
+def test_duplicates_are_independent():
+    results = graphql.loads_many(['{ user(id: 1) { id } }'] * 3)
+
+    results[0][0]['params']['id'] = 2
+    results[1][0]['properties'].append({'name': 'name'})
+    assert results[2] == graphql.loads('{ user(id: 1) { id } }')
+
+
+def test_shared_cache():
+    cache = graphql.QueryCache()
+    graphql.loads('{ a { b } }', cache=cache)
+
+    graphql.loads_many(['{ a { b } }', '{ c { d } }', '{ c { d } }'], cache=cache)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        graphql.loads_many(['{ a { b } }'], engine='slow')
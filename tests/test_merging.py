@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import graphql
+
+QUERIES = [
+    '{ user(id: 232) { id, name } }',
+    '{ user(id: 232) { name, photo(size: 50) { url } }, company { name } }',
+    '{ user(id: 233) { id }, user(id: 232) { photo(size: 50) { width }, friends { id } } }',
+    '{ user(id: 232).first(2) { name } }',
+]
+
+
+def test_merge():
+    merged = graphql.merge([graphql.loads(q) for q in QUERIES])
+
+    assert graphql.dumps(merged.ast, compact=True) == (
+        '{user(id:232){id,name,photo(size:50){url,width},friends{id}},'
+        'company{name},user(id:233){id},user(id:232).first(2){name}}')
+    assert merged.positions == [[0], [0, 1], [2, 0], [3]]
+
+
+def test_merge_nodes():
+    asts = [graphql.loads(q) for q in QUERIES]
+    merged = graphql.merge(asts)
+
+    assert graphql.merge([graphql.loads(q, nodes=True) for q in QUERIES]).ast == merged.ast
+    assert asts == [graphql.loads(q) for q in QUERIES]  # untouched
+
+
+def test_fields_and_objects_dont_merge():
+    merged = graphql.merge([graphql.loads('{ user { photo } }'),
+                            graphql.loads('{ user { photo { url } } }')])
+
+    assert graphql.dumps(merged.ast, compact=True) == '{user{photo},user{photo{url}}}'
+    assert merged.positions == [[0], [1]]
+
+
+def test_conflicts_dont_merge():
+    merged = graphql.merge([graphql.loads(q) for q in [
+        '{ user(id: 1) { id, photo(size: 50) { url } } }',
+        '{ user(id: 1) { name, photo(size: 100) { url } } }',
+        '{ user(id: 1) { photo(size: 100) { width } } }',
+        '{ user(id: 1) { photo(size: 50) { width }, friends { photo { url } } } }',
+    ]])
+
+    assert graphql.dumps(merged.ast, compact=True) == (
+        '{user(id:1){id,photo(size:50){url,width},friends{photo{url}}},'
+        'user(id:1){name,photo(size:100){url,width}}}')
+    assert merged.positions == [[0], [1], [1], [0]]
+
+    small = {'id': 1, 'photo': {'url': 's.png', 'width': 50}, 'friends': []}
+    large = {'name': 'Mary', 'photo': {'url': 'l.png', 'width': 100}}
+    assert merged.split([small, large]) == [
+        [{'id': 1, 'photo': {'url': 's.png'}}],
+        [{'name': 'Mary', 'photo': {'url': 'l.png'}}],
+        [{'photo': {'width': 100}}],
+        [{'photo': {'width': 50}, 'friends': []}],
+    ]
+
+
+def test_split_params_conflict():
+    merged = graphql.merge([graphql.loads('{ user(id: 1) { photo(size: 50) { url } } }'),
+                            graphql.loads('{ user(id: 1) { photo(size: 100) { url } } }')])
+    response = [{'photo': {'url': 'small.png'}}, {'photo': {'url': 'large.png'}}]
+
+    assert merged.split(response) == [[{'photo': {'url': 'small.png'}}],
+                                      [{'photo': {'url': 'large.png'}}]]
+
+
+def test_split():
+    merged = graphql.merge([graphql.loads(q) for q in QUERIES[:2]])
+    user = {'id': 232, 'name': 'Mary', 'photo': [{'url': 'a.png'}, {'url': 'b.png'}]}
+
+    assert merged.split([user, None]) == [
+        [{'id': 232, 'name': 'Mary'}],
+        [{'name': 'Mary', 'photo': [{'url': 'a.png'}, {'url': 'b.png'}]}, None],
+    ]
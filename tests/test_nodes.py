@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import pickle
+import graphql
+from graphql.nodes import UNSET, Object, Field, Filter, from_dicts, to_dicts
+
+
+QUERY = """
+{
+    user(null).first(10).active() {
+        id,
+        photo(size: 50) {
+            url
+        }
+    },
+    company {
+        name
+    }
+}"""
+
+NODES = [
+    Object('user', None, [Filter('first', 10), Filter('active', {})], [
+        Field('id'),
+        Object('photo', {'size': 50}, None, [Field('url')]),
+    ]),
+    Object('company', properties=[Field('name')]),
+]
+
+
+def test_loads_nodes():
+    assert graphql.loads(QUERY, nodes=True) == NODES
+    assert graphql.loads(QUERY, nodes=True, engine='fast') == NODES
+    assert graphql.loads(QUERY, nodes=True, cache=graphql.QueryCache()) == NODES
+
+
+def test_nodes_attributes():
+    user, company = NODES
+
+    assert company.params is UNSET
+    assert company.filters is None
+    assert user.filters[0].name == 'first'
+    assert user.filters[0].params == 10
+    assert user.properties[0].params is UNSET
+    assert user.properties[0].properties is None
+
+
+def test_conversion():
+    ast = graphql.loads(QUERY)
+
+    assert from_dicts(ast) == NODES
+    assert to_dicts(NODES) == ast
+    assert to_dicts(from_dicts(ast)) == ast
+
+
+def test_dumps_nodes():
+    ast = graphql.loads(QUERY)
+
+    assert graphql.dumps(NODES) == graphql.dumps(ast)
+    assert graphql.dumps(NODES, compact=True) == graphql.dumps(ast, compact=True)
+
+
+def test_pickle():
+    assert pickle.loads(pickle.dumps(UNSET)) is UNSET
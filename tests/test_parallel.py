@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import multiprocessing
+from pyparsing import ParseException
+import graphql
+from graphql import parallel
+from graphql.parser import ParseError
+
+
+QUERIES = ['{ user(id: %d).first(2) { id, photo(size: 50) { url } } }' % (i % 7)
+           for i in range(40)]
+
+
+def test_loads_many():
+    expected = [graphql.loads(q) for q in QUERIES]
+
+    assert parallel.loads_many(QUERIES, workers=2, chunksize=3) == expected
+    assert parallel.loads_many(QUERIES, workers=2, engine='fast') == expected
+    assert parallel.loads_many(QUERIES, workers=2, nodes=True) == graphql.loads_many(QUERIES, nodes=True)
+
+
+def test_errors():
+    queries = ['{ a { b } }', '{ a }', r'{ a("\q") { c } }', '{ a { b } }']
+
+    results = parallel.loads_many(queries, workers=2, chunksize=1)
+    assert results[0] == results[3] == graphql.loads(queries[0])
+    assert isinstance(results[1], ParseException)
+    assert results[1].loc == graphql.loads_many(queries[1:2])[0].loc
+    assert type(results[2]) is ValueError
+
+    results = parallel.loads_many(queries, workers=2, engine='fast')
+    assert isinstance(results[1], ParseError)
+    assert str(results[1]) == str(graphql.loads_many(queries[1:2], engine='fast')[0])
+
+
+def test_duplicates_are_independent():
+    results = parallel.loads_many(QUERIES, workers=2)
+
+    results[0][0]['params']['id'] = 100
+    assert results[7] == graphql.loads(QUERIES[7])
+
+
+def test_shared_pool():
+    pool = multiprocessing.Pool(2)
+    try:
+        assert parallel.loads_many(QUERIES[:5], pool=pool) == graphql.loads_many(QUERIES[:5])
+        assert parallel.loads_many(QUERIES[5:], pool=pool) == graphql.loads_many(QUERIES[5:])
+    finally:
+        pool.close()
+        pool.join()
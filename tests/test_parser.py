@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import pyparsing as pp
+import pytest
+import graphql
+from graphql import parser
+from graphql.parser import ParseError, LimitExceeded
+
+
+QUERIES = [
+    '{ user { id, name } }',
+    '{ user(232) { id, name } }',
+    '{ user(null) { id } }',
+    '{ user(true) { id } }',
+    '{ user(false) { id } }',
+    '{ user(id: null) { id } }',
+    '{ user() { id } }',
+    '{ entity/23(component/name: "textarea") { id } }',
+    '{ photos.first(2) { url, width, height } }',
+    '{ photos.first() { url } }',
+    '{ friends.after(2434423).first(10) { id } }',
+    '{ numbers(a: -12.334, b: 42, c: 2.5) { id } }',
+    '{ user(nullable: 1) { id } }',
+    '{ user(true: 1) { id } }',
+    '{ user.first(falsey: 2) { id } }',
+    '{ user(x: 1, true: 2, null/x: 3) { id } }',
+    """
+    {
+        photos(username: "Louro Jose").after(id: 232, username: "Hebe").sortBy("url") {
+            url,
+            width,
+            height
+        }
+    }""",
+    """
+    {
+        user(232) {
+            name,
+            id
+        },
+        company(userId: 232) {
+            address
+        }
+    }""",
+    """
+    {
+        user(232) {
+            id,
+            name,
+            photo(size: 50) {
+                url,
+                width,
+                height
+            }
+        }
+    }
+    """,
+]
+
+
+def test_engines_agree():
+    for query in QUERIES:
+        assert graphql.loads(query, engine='fast') == graphql.loads(query)
+
+
+def test_engines_agree_on_whitespace():
+    valid = ['{a{b}}', '\n{a{b}}', '  \n{a{b}}', '\n  {a{b}}', '\r\n{a{b}}',
+             '{a{b}} ', '{a{b}}\n', '{a{b}}\n  \n']
+    invalid = [' {a{b}}', '\t{a{b}}', '\r{a{b}}', '{a{b}} x', '{a{b}}\n garbage',
+               '{a{b}}\n\n{c{d}}']
+
+    for query in valid:
+        assert graphql.loads(query, engine='fast') == graphql.loads(query) == [
+            {'name': 'a', 'properties': [{'name': 'b'}]}]
+
+    for query in invalid:
+        with pytest.raises(ParseError):
+            graphql.loads(query, engine='fast')
+        with pytest.raises(pp.ParseException):
+            graphql.loads(query)
+
+
+def test_tokenize():
+    assert parser.tokenize('user(id: -12.5).first(2) {id}') == [
+        'user', '(', 'id', ':', '-12.5', ')', '.', 'first', '(', '2', ')',
+        '{', 'id', '}'
+    ]
+    assert parser.tokenize('("Foo, bar" \'baz\')') == ['(', '"Foo, bar"', "'baz'", ')']
+    assert parser.tokenize('entity/23 _foo') == ['entity/23', '_foo']
+
+
+def test_invalid_queries():
+    invalid = [
+        '',
+        '{}',
+        '{ user {} }',
+        '{ user { id, } }',
+        '{ User {id, name} AnotherUser {id, name} }',
+        '{ User {id, name}, AnotherUser {id, name} } foo bar',
+        'foo bar{ User {id, name} }',
+        '{ user(id 232) { id } }',
+        '{ user(id: 232 { id } }',
+        '{ user(232, 233) { id } }',
+        '{ user(id: 232, 233) { id } }',
+        '{ user(foo) { id } }',
+        '{ user.first { id } }',
+        '{ user { photo(size: 50) } }',
+        '{ 42as { id } }',
+        '{ /fas { id } }',
+        '{ user(-) { id } }',
+        '{ user("foo) { id } }',
+        '{ user(',
+    ]
+
+    for query in invalid:
+        with pytest.raises(ParseError):
+            graphql.loads(query, engine='fast')
+
+
+def test_error_position():
+    try:
+        graphql.loads('{\n  user {id, name}\n  company {id}\n}', engine='fast')
+    except ParseError as e:
+        assert e.loc == 22
+        assert (e.lineno, e.col) == (3, 3)
+    else:
+        assert False, 'ParseError not raised'
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        graphql.loads('{ user { id } }', engine='yacc')
+
+
+def test_decode():
+    assert parser.decode('232') == 232
+    assert type(parser.decode('232')) is int
+    assert parser.decode('-1.5') == -1.5
+    assert parser.decode('null') is None
+    assert parser.decode('true') is True
+    assert parser.decode('false') is False
+    assert parser.decode('"foo"') == 'foo'
+    assert parser.decode("'foo'") == 'foo'
+    assert parser.decode(r"'it\'s'") == "it's"
+    assert parser.decode('"say ""hi"""') == 'say "hi"'
+    assert parser.decode("'a\"b'") == 'a"b'
+    assert parser.decode(r'"a\nb\t\\\/"') == 'a\nb\t\\/'
+    assert parser.decode(r'"é\x41"') == '\xe9A'
+    # Not a raw string: Python 2 would read the escapes in it
+    assert parser.decode('"\\ud83d\\ude00"') == '\U0001f600'
+
+    with pytest.raises(ValueError):
+        parser.decode(r'"\q"')
+
+
+def test_single_quoted_strings():
+    query = "{ user(name: 'Mary', title: 'it\\'s') { id } }"
+
+    for engine in graphql.graphql.ENGINES:
+        assert graphql.loads(query, engine=engine)[0]['params'] == {'name': 'Mary', 'title': "it's"}
+
+
+def test_deeply_nested():
+    depth = 100000
+    query = '{' + 'a{' * depth + 'b' + '}' * (depth + 1)
+
+    # Compared through dumps, comparing the dicts would recurse
+    assert graphql.dumps(parser.parse(query), compact=True) == query
+    assert graphql.dumps(parser.parse(query, nodes=True), compact=True) == query
+
+
+def test_limits():
+    query = '{ user(id: 232) { id, photos.first(10) { url } }, company { name } }'
+
+    for limit, maximum in [('bytes', len(query) - 1), ('tokens', 25), ('depth', 2),
+                           ('fields', 5), ('objects', 1)]:
+        with pytest.raises(LimitExceeded):
+            parser.parse(query, limits={limit: maximum})
+
+        with pytest.raises(LimitExceeded):
+            graphql.analysis.check(query, {limit: maximum})
+
+    limits = {'bytes': len(query), 'tokens': 26, 'depth': 3, 'fields': 6, 'objects': 2}
+    assert parser.parse(query, limits=limits) == graphql.loads(query)
+    graphql.analysis.check(query, limits)
+
+    with pytest.raises(ValueError):
+        parser.parse(query, limits={'size': 10})
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import graphql
+from graphql.cache import QueryCache
+from graphql.project import walk
+
+QUERY = '{ user(id: 232) { id, name, photo(size: 50) { url }, friends.first(2) { name } } }'
+
+ROW = {
+    'id': 232,
+    'name': 'Mary',
+    'email': 'mary@example.com',
+    'photo': {'url': 'https://example.com/232.jpg', 'width': 50},
+    'friends': [{'id': 1, 'name': 'John'}, None],
+}
+
+PROJECTED = {
+    'id': 232,
+    'name': 'Mary',
+    'photo': {'url': 'https://example.com/232.jpg'},
+    'friends': [{'name': 'John'}, None],
+}
+
+
+class Row(object):
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+def test_project():
+    projector = graphql.project.compile(graphql.loads(QUERY)[0])
+
+    assert projector(ROW) == PROJECTED
+    assert projector([ROW, None]) == [PROJECTED, None]
+    assert projector(None) is None
+    assert projector.many([ROW] * 3) == [PROJECTED] * 3
+    assert projector.many(iter([ROW, None])) == [PROJECTED, None]
+
+
+def test_project_nodes():
+    obj = graphql.loads(QUERY)[0]
+    node = graphql.loads(QUERY, nodes=True)[0]
+
+    assert graphql.project.compile(node)(ROW) == PROJECTED
+    assert graphql.project.compile(node) is graphql.project.compile(obj)
+
+
+def test_project_missing():
+    projector = graphql.project.compile(graphql.loads(QUERY)[0])
+    row = {'id': 233, 'photo': {'width': 50}, 'friends': None}
+
+    assert projector(row) == {'id': 233, 'photo': {}, 'friends': None}
+    assert projector.many([ROW, row]) == [PROJECTED, projector(row)]
+
+
+def test_project_attributes():
+    projector = graphql.project.compile(graphql.loads(QUERY)[0], attributes=True)
+    row = Row(id=232, name='Mary', email='mary@example.com',
+              photo=Row(url='https://example.com/232.jpg', width=50),
+              friends=[Row(id=1, name='John'), None])
+
+    assert projector(row) == PROJECTED
+    assert projector.many([row, Row(id=233)]) == [PROJECTED, {'id': 233}]
+
+
+def test_project_names():
+    ast = graphql.loads('{ user { class, a/b, id } }')
+    row = {'class': 1, 'a/b': 2, 'id': 3, 'x': 4}
+
+    assert graphql.project.compile(ast[0])(row) == {'class': 1, 'a/b': 2, 'id': 3}
+    assert graphql.project.compile(ast[0], attributes=True)(Row(**row)) == {'class': 1, 'a/b': 2, 'id': 3}
+
+
+def test_project_cache():
+    cache = QueryCache(copy=False)
+    projector = graphql.project.compile(graphql.loads(QUERY)[0], cache=cache)
+
+    # Same shape, other literals
+    other = graphql.loads('{ user(id: 1) { id, name, photo(size: 20) { url }, friends.first(5) { name } } }')
+    assert graphql.project.compile(other[0], cache=cache) is projector
+    assert graphql.project.compile(other[0], attributes=True, cache=cache) is not projector
+    assert cache.hits == 1
+
+
+def test_project_matches_walk():
+    ast = graphql.loads(QUERY)
+    rows = [ROW, {'id': 1}, None, [ROW], {'photo': None, 'friends': []}]
+
+    assert graphql.project.compile(ast[0]).many(rows) == walk(rows, ast[0]['properties'])
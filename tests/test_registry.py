@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import os
+import subprocess
+import sys
+import pytest
+import graphql
+from graphql.hashing import canonicalize
+from graphql.registry import Registry, query_hash
+
+
+QUERY = """
+{
+    photos(username: "Louro José", size: 50).after(id: 232).first(10) {
+        url,
+        owner {
+            id,
+            name
+        }
+    }
+}"""
+
+
+def test_register_and_resolve():
+    registry = Registry()
+    key = registry.register(QUERY)
+
+    assert key in registry
+    assert len(registry) == 1
+    assert registry.resolve(key) == graphql.loads(QUERY)
+    assert registry.compact(key) == graphql.dumps(graphql.loads(QUERY), compact=True)
+    assert key == query_hash(canonicalize(QUERY))
+
+    # Same query, different whitespace
+    assert registry.register(' '.join(QUERY.split())) == key
+    assert len(registry) == 1
+
+    with pytest.raises(KeyError):
+        registry.resolve('0' * 64)
+
+
+def test_keys_are_stable():
+    registry = Registry()
+    key = registry.register('{ user(a: 1, b: 2, c: 3, d: 4) { id } }')
+    assert registry.register('{ user(d: 4, c: 3, b: 2, a: 1) { id } }') == key
+
+    # Neither does string hashing change it, randomized on some Pythons
+    script = ('import graphql.registry; print(graphql.registry.Registry().register('
+              '"{ user(a: 1, b: 2, c: 3, d: 4) { id } }"))')
+    for seed in ['1', '2', '3']:
+        env = {'PYTHONHASHSEED': seed, 'PYTHONPATH': os.pathsep.join(sys.path)}
+        output = subprocess.check_output([sys.executable, '-c', script], env=env)
+        assert output.decode('ascii').strip() == key
+
+
+def test_resolve_returns_copies():
+    registry = Registry()
+    key = registry.register(QUERY)
+
+    registry.resolve(key)[0]['properties'].pop()
+    assert registry.resolve(key) == graphql.loads(QUERY)
+    assert registry.resolve(key, copy=False) is registry.resolve(key, copy=False)
+
+
+def test_compact_form_round_trips():
+    registry = Registry(engine='fast')
+    key = registry.register(QUERY)
+
+    assert graphql.loads(registry.compact(key)) == registry.resolve(key)
+
+
+def test_save_and_load(tmpdir):
+    path = str(tmpdir.join('queries.json'))
+
+    registry = Registry()
+    keys = [registry.register(QUERY),
+            registry.register('{ user(232) { id }, company(null) { name } }')]
+    registry.save(path)
+
+    loaded = Registry.load(path)
+    assert sorted(loaded) == sorted(keys)
+    for key in keys:
+        assert loaded.resolve(key) == registry.resolve(key)
+        assert loaded.compact(key) == registry.compact(key)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import mmap
+import tempfile
+import pytest
+import graphql
+from graphql import spans
+from graphql.nodes import to_dicts
+from graphql.parser import ParseError
+
+QUERY = '''{
+    user(id: 232, name: "{ not a brace }").first(10) {
+        id,
+        photo (size: 50) { url },
+        name
+    },
+    company { name }
+}'''
+
+
+def test_buffers():
+    data = QUERY.encode('utf-8')
+    expected = graphql.loads(QUERY)
+
+    with tempfile.TemporaryFile() as f:
+        f.write(data)
+        f.flush()
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        for buffer in [QUERY, data, bytearray(data), memoryview(data), mapped]:
+            objects = spans.parse(buffer)
+            assert to_dicts(objects) == expected
+            assert graphql.dumps(objects) == graphql.dumps(expected)
+
+        mapped.close()
+
+
+def test_offsets():
+    user, company = spans.parse(QUERY)
+
+    assert (user.start, user.end) == (6, QUERY.index('    },\n') + 5)
+    assert company.text == 'company { name }'
+    assert [prop.name for prop in user.properties] == ['id', 'photo', 'name']
+    assert user.properties[1].text == 'photo (size: 50) { url }'
+
+
+def test_lazy():
+    objects = list(spans.iterparse('{ a(: oops) { b }, c { d, } }'))
+    assert [obj.name for obj in objects] == ['a', 'c']
+
+    with pytest.raises(ParseError) as raised:
+        objects[0].params
+    assert raised.value.loc == 4
+
+    with pytest.raises(ParseError) as raised:
+        objects[1].properties
+    assert raised.value.loc == 26
+
+
+def test_invalid_queries():
+    for query in ['', 'user { id }', '{ user { id } ', '{ user { id } } x', '{ user("foo) { id } }',
+                  '{ user }', '{ 1 { id } }']:
+        with pytest.raises(ParseError):
+            spans.parse(query.encode('utf-8'))
+
+
+def test_error_position():
+    try:
+        spans.parse('{\n  user {id, name},\n  company {id}\n}x'.encode('utf-8'))
+    except ParseError as e:
+        assert (e.loc, e.lineno, e.col) == (37, 4, 2)
+    else:
+        assert False, 'ParseError not raised'
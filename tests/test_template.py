@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import pytest
+import graphql
+from graphql.cache import QueryCache
+from graphql.parser import ParseError
+
+
+QUERY = """
+{
+    user(id: 232, name: "Louro Jose").first(2).after() {
+        id,
+        photo(50) {
+            url
+        }
+    },
+    company(null) {
+        address
+    }
+}"""
+
+
+def test_compile():
+    template = graphql.compile(QUERY)
+
+    assert template.values == [232, "Louro Jose", 2, 50, None]
+    assert template.bind() == graphql.loads(QUERY)
+
+
+def test_bind():
+    template = graphql.compile(QUERY)
+    other = QUERY.replace('232', '233').replace('null', '"ACME"')
+
+    assert template.bind([233, "Louro Jose", 2, 50, "ACME"]) == graphql.loads(other)
+
+    with pytest.raises(ValueError):
+        template.bind([1, 2])
+
+
+def test_bind_returns_new_objects():
+    template = graphql.compile(QUERY)
+
+    template.bind()[0]['params']['id'] = 1
+    assert template.bind() == graphql.loads(QUERY)
+
+
+def test_same_shape_shares_skeleton():
+    cache = QueryCache(copy=False)
+
+    a = graphql.compile('{ user(id: 232) { id } }', cache=cache)
+    b = graphql.compile('{\n  user(id: "foo") {\n    id\n  }\n}', cache=cache)
+    c = graphql.compile('{ user(name: 232) { id } }', cache=cache)
+
+    assert a.skeleton is b.skeleton
+    assert a.fingerprint == b.fingerprint != c.fingerprint
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert b.values == ['foo']
+
+
+def test_invalid_queries():
+    with pytest.raises(ParseError):
+        graphql.compile('{ user(id: 232) { id, } }')
+
+    try:
+        graphql.compile('{ user(id: 232 { id } }')
+    except ParseError as e:
+        assert e.loc == 15  # position in the original query
+    else:
+        assert False, 'ParseError not raised'
+
+
+def test_start_of_line():
+    with pytest.raises(ParseError):
+        graphql.compile(' { user(id: 232) { id } }')
+
+    assert graphql.compile('\n { user(id: 232) { id } }').bind() == graphql.loads('{ user(id: 232) { id } }')
+
+
+def test_star_import_keeps_builtin_compile():
+    namespace = {}
+    exec('from graphql import *', namespace)
+
+    assert 'compile' not in namespace
+    assert namespace['loads'] is graphql.loads
+    assert all(hasattr(graphql, name) for name in graphql.__all__)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import threading
+import pytest
+import graphql
+from graphql import grammar
+from graphql.analysis import LimitExceeded
+
+QUERIES = ['{ user(id: %d).first(2) { id, photo(size: 50) { url }, friends { name } } }' % i
+           for i in range(20)]
+
+THREADS = 8
+
+
+def run_threads(parse, rounds=2):
+    """
+    Parses every query `rounds` times in each of `THREADS` threads, all
+    started at once, and returns the results of each thread.
+    """
+
+    barrier = threading.Event()
+    results = [None] * THREADS
+    errors = []
+
+    def work(index):
+        barrier.wait()
+        try:
+            results[index] = [[parse(query) for query in QUERIES] for _ in range(rounds)]
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    barrier.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    return results
+
+
+def test_parser():
+    parser = graphql.Parser()
+
+    assert parser.loads(QUERIES[0]) == graphql.loads(QUERIES[0])
+    assert graphql.Parser(engine='fast', nodes=True).loads(QUERIES[0]) == \
+        graphql.loads(QUERIES[0], nodes=True)
+
+
+def test_parser_options():
+    parser = graphql.Parser(engine='fast', limits={'depth': 2})
+
+    with pytest.raises(LimitExceeded):
+        parser.loads(QUERIES[0])
+    assert graphql.loads(QUERIES[0], engine='fast')
+
+    with pytest.raises(ValueError):
+        graphql.Parser(engine='regex')
+
+
+def test_parser_grammar():
+    parser = graphql.Parser(memoize=True, debug=True)
+
+    assert parser.grammar is parser.grammar
+    assert parser.grammar is not grammar.default
+    assert parser.grammar.root.debug
+    assert not grammar.root.debug
+
+
+def test_loads_threads():
+    expected = [graphql.loads(query) for query in QUERIES]
+
+    for results in run_threads(graphql.loads):
+        assert results == [expected] * 2
+
+    for results in run_threads(lambda query: graphql.loads(query, memoize=True)):
+        assert results == [expected] * 2
+
+
+def test_shared_parser_threads():
+    expected = [graphql.loads(query) for query in QUERIES]
+    cache = graphql.QueryCache(max_entries=10)
+
+    # A fresh parser, so threads race to build its grammar
+    for options in [{}, {'memoize': True}, {'engine': 'fast'}, {'cache': cache}]:
+        parser = graphql.Parser(**options)
+        for results in run_threads(parser.loads):
+            assert results == [expected] * 2